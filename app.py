@@ -49,9 +49,9 @@ async def lifespan(app: FastAPI):
     
     yield
     
-    # Shutdown: Stop the simulation
+    # Shutdown: Stop the simulation and any planner workers
     if fleet_manager:
-        fleet_manager.stop_simulation()
+        fleet_manager.shutdown()
     print("\n👋 Warehouse Fleet Simulator stopped")
 
 
@@ -152,18 +152,25 @@ async def get_fleet_summary() -> Dict:
 
 
 @app.get("/environment")
-async def get_environment() -> Dict:
+async def get_environment(include_grid: bool = True) -> Dict:
     """
     Get the warehouse environment layout.
     Returns the grid with cell types (empty, obstacle, charging_station, delivery_zone).
     
+    Cell types come both as the dense "grid" rows and as the populated
+    "tiles" (see WarehouseGrid.to_dict); clients that read the tiles can pass
+    include_grid=false to skip the dense rows on large sites.
+    
+    Args:
+        include_grid: Include the dense "grid" rows (default: True)
+    
     Returns:
         Dictionary with grid layout, dimensions, and special locations
     """
     if fleet_manager is None:
         raise HTTPException(status_code=503, detail="Fleet manager not initialized")
     
-    return fleet_manager.warehouse_grid.to_dict()
+    return fleet_manager.warehouse_grid.to_dict(include_grid=include_grid)
 
 
 @app.post("/reset", response_model=ResetResponse)
@@ -417,8 +424,11 @@ async def update_environment(
         if success:
             # Update pathfinder obstacles
             fleet_manager.pathfinder.set_warehouse_grid(warehouse_grid)
+            # Only robots whose remaining path crosses the new cell replan
+            replanning = fleet_manager.invalidate_blocked_paths([(x, y)])
             return {
                 "message": f"Added {cell_type} at ({x}, {y})",
+                "replanning_robots": replanning,
                 "environment": warehouse_grid.to_dict()
             }
         else:
@@ -492,8 +502,11 @@ async def add_environment_element(
     if success:
         # Update pathfinder obstacles
         fleet_manager.pathfinder.set_warehouse_grid(warehouse_grid)
+        # Only robots whose remaining path crosses the new cell replan
+        replanning = fleet_manager.invalidate_blocked_paths([(x, y)])
         return {
             "message": f"Added {cell_type} at ({x}, {y})",
+            "replanning_robots": replanning,
             "environment": warehouse_grid.to_dict()
         }
     else:
@@ -7,13 +7,23 @@ job management, and environment integration with charging stations and delivery
 import random
 import threading
 import time
-from typing import List, Dict, Optional, Set, Tuple
+from functools import partial
+from typing import Callable, Iterable, List, Dict, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from models.robot import Robot, RobotStatus
 from models.task import Task, TaskType, TaskStatus
 from models.environment import WarehouseGrid
+from models.layout_file import open_layout
 from models.job_manager import JobManager, Job, JobStatus
+from utils.congestion import CongestionMap
+from utils.path_index import PathIndex
 from utils.pathfinding import PathFinder
+from utils.planner_pool import PlannerPool
+from utils.reservation import ReservationTable
+
+
+# Smallest node budget any single plan gets when a per-update planning budget is set
+MIN_PLAN_BUDGET = 32
 
 
 class FleetManager:
@@ -36,7 +46,11 @@ class FleetManager:
     """
     
     def __init__(self, num_robots: int = 5, grid_size: int = 20, 
-                 update_interval: int = 2):
+                 update_interval: int = 2, incremental_planning: bool = False,
+                 planning_strategy: str = "astar", cooperative_planning: bool = False,
+                 planning_budget: Optional[int] = None, planning_weight: float = 1.0,
+                 async_planning: Optional[str] = None, planner_workers: Optional[int] = None,
+                 congestion_penalty: Optional[float] = None, layout_path: Optional[str] = None):
         """
         Initialize the fleet manager.
         
@@ -44,7 +58,39 @@ class FleetManager:
             num_robots: Number of robots to create (default: 5)
             grid_size: Size of the grid (default: 20)
             update_interval: Seconds between updates (default: 2)
+            incremental_planning: Repair per-robot D* Lite searches on layout
+                changes instead of replanning from scratch (default: False)
+            planning_strategy: PathFinder search strategy, e.g. "hpa" for
+                large grids (default: "astar")
+            cooperative_planning: Plan around other robots' future positions
+                using a shared space-time reservation table (default: False)
+            planning_budget: Cells A* may expand per update, split across the
+                robots planning in it; robots whose search is cut short follow
+                the partial path and plan the rest later (default: None, unbounded)
+            planning_weight: Heuristic weight for A*; above 1 trades path
+                length for faster searches (default: 1.0)
+            async_planning: Plan on a "thread" or "process" pool against a grid
+                snapshot while robots wait in the PLANNING state (default: None,
+                plan inline; cooperative planning always plans inline)
+            planner_workers: Number of planner pool workers (default: executor default)
+            congestion_penalty: Extra move cost per decayed robot visit to a cell;
+                spreads traffic over alternative routes (default: None, unit costs)
+            layout_path: Square layout file (see models.layout_file) to map
+                instead of generating a grid; overrides grid_size (default: None)
         """
+        if async_planning not in (None, "thread", "process"):
+            raise ValueError(f"Unknown async planning mode: {async_planning}")
+
+        # Initialize warehouse environment
+        if layout_path:
+            self.warehouse_grid = open_layout(layout_path)
+            if self.warehouse_grid.width != self.warehouse_grid.height:
+                raise ValueError(f"Layout {layout_path} is {self.warehouse_grid.width}x"
+                                 f"{self.warehouse_grid.height}; the fleet needs a square grid")
+            grid_size = self.warehouse_grid.width
+        else:
+            self.warehouse_grid = WarehouseGrid(grid_size, grid_size)
+        
         self.grid_size = grid_size
         self.num_robots = num_robots
         self.update_interval = update_interval
@@ -52,15 +98,42 @@ class FleetManager:
         self._simulation_thread = None
         self._stop_simulation = False
         
-        # Initialize warehouse environment
-        self.warehouse_grid = WarehouseGrid(grid_size, grid_size)
-        
         # Task management with environment-aware pathfinding
-        self.pathfinder = PathFinder(grid_size, self.warehouse_grid)
+        self.pathfinder = PathFinder(grid_size, self.warehouse_grid,
+                                     incremental=incremental_planning,
+                                     strategy=planning_strategy,
+                                     weight=planning_weight)
         self.active_tasks: List[Task] = []
         self.completed_tasks: List[Task] = []
         self.failed_tasks: List[Task] = []
         
+        # Cell -> robots whose remaining path crosses it, for targeted replanning
+        self.path_index = PathIndex()
+        
+        # Cooperative planning: simulation tick and (cell, tick) reservations
+        self.cooperative_planning = cooperative_planning
+        self.tick = 0
+        self.reservations = ReservationTable()
+        
+        # Per-update planning budget, refilled at the start of every update
+        self.planning_budget = planning_budget
+        self._budget_left = 0
+        self._planners_left = 0
+        
+        # Asynchronous planning: robot_id -> (future, apply, status, job, task, grid version)
+        # per pending request
+        self.planner_pool: Optional[PlannerPool] = None
+        if async_planning:
+            self.planner_pool = PlannerPool(self.warehouse_grid, planner_workers,
+                                            use_processes=async_planning == "process",
+                                            strategy=planning_strategy, weight=planning_weight)
+        self._pending_plans: Dict[int, Tuple] = {}
+        
+        # Congestion-aware planning: recent traffic per cell, refreshed every update
+        self.congestion: Optional[CongestionMap] = None
+        if congestion_penalty:
+            self.congestion = CongestionMap(grid_size, grid_size, penalty=congestion_penalty)
+        
         # Job management
         self.job_manager = JobManager(self.warehouse_grid)
         
@@ -81,6 +154,7 @@ class FleetManager:
     def _initialize_robots(self):
         """Create robots at the starting station."""
         self.robots = []
+        self.path_index.clear()
         starting_station = self.warehouse_grid.get_starting_station()
         
         if not starting_station:
@@ -95,6 +169,7 @@ class FleetManager:
                 status=RobotStatus.IDLE,
                 battery=100  # Start with full battery
             )
+            robot.path_index = self.path_index
             self.robots.append(robot)
         print(f"✓ Initialized {self.num_robots} robots at starting station {starting_station}")
     
@@ -116,8 +191,12 @@ class FleetManager:
         if total_jobs >= self.max_active_jobs:
             return
         
-        # Generate a new job from a random pickup zone
+        # Generate a new job from a random pickup zone reachable from the starting station
         pickup_zones = self.warehouse_grid.pickup_zones
+        starting_station = self.warehouse_grid.get_starting_station()
+        if starting_station:
+            pickup_zones = [zone for zone in pickup_zones
+                            if self.warehouse_grid.are_connected(starting_station, zone)]
         if not pickup_zones:
             return  # No pickup zones available
         
@@ -151,8 +230,168 @@ class FleetManager:
         else:
             print("✓ Continuous mode disabled")
     
+    def _plan_path(self, robot: Robot, goal: Tuple[int, int], occupied: Set[Tuple[int, int]],
+                   depart_tick: Optional[int] = None) -> Optional[List[Tuple[int, int]]]:
+        """
+        Plan a path for a robot, cooperatively if enabled.
+        
+        Args:
+            robot: Robot to plan for
+            goal: Goal position (x, y)
+            occupied: Positions occupied by other robots
+            depart_tick: Tick at which the robot is still at its current cell
+                (default: the current tick; the robot starts moving next tick)
+        
+        Returns:
+            List of positions to follow, or None if no path exists
+        """
+        start = (robot.x, robot.y)
+        if self.cooperative_planning:
+            if depart_tick is None:
+                depart_tick = self.tick
+            return self.pathfinder.find_cooperative_path(
+                start, goal, self.reservations, robot.id, depart_tick)
+        if self.planning_budget is None:
+            return self.pathfinder.find_path(start, goal, occupied, agent_id=robot.id)
+        
+        # Split what is left of this update's budget over the robots still to plan
+        share = max(MIN_PLAN_BUDGET, self._budget_left // max(1, self._planners_left))
+        path = self.pathfinder.find_path(start, goal, occupied, agent_id=robot.id, node_budget=share)
+        self._budget_left = max(0, self._budget_left - self.pathfinder.last_expansions)
+        self._planners_left = max(1, self._planners_left - 1)
+        return path
+    
+    def _request_path(self, robot: Robot, goal: Tuple[int, int], occupied: Set[Tuple[int, int]],
+                      apply: Callable[[Optional[List[Tuple[int, int]]]], None],
+                      depart_tick: Optional[int] = None):
+        """
+        Plan a path for a robot and hand the result to apply.
+        
+        With async planning the request goes to the planner pool and the robot
+        waits in the PLANNING state; apply runs in a later update once the path
+        is ready, unless the robot's job or task changed in the meantime.
+        Otherwise apply runs immediately.
+        
+        Args:
+            robot: Robot to plan for
+            goal: Goal position (x, y)
+            occupied: Positions occupied by other robots
+            apply: Called with the path (or None if no path exists)
+            depart_tick: See _plan_path
+        """
+        if self.planner_pool is None or self.cooperative_planning:
+            apply(self._plan_path(robot, goal, occupied, depart_tick))
+            return
+        
+        future = self.planner_pool.submit((robot.x, robot.y), goal, occupied)
+        self._pending_plans[robot.id] = (future, apply, robot.status, robot.current_job,
+                                         robot.current_task, self.warehouse_grid.version)
+        robot.status = RobotStatus.PLANNING
+    
+    def _apply_finished_plans(self):
+        """Hand finished pool plans to the robots waiting for them."""
+        for robot in self.robots:
+            pending = self._pending_plans.get(robot.id)
+            if pending is None or not pending[0].done():
+                continue
+            del self._pending_plans[robot.id]
+            
+            future, apply, status, job, task, version = pending
+            # Cancelled or reset while the plan was running
+            if (robot.status != RobotStatus.PLANNING or
+                    robot.current_job is not job or robot.current_task is not task):
+                continue
+            
+            robot.status = status
+            try:
+                path = future.result()
+            except Exception as error:
+                print(f"✗ Planning failed for Robot {robot.id}: {error}")
+                path = None
+            # Planned on an older layout and now blocked: plan again next update
+            if (path and version != self.warehouse_grid.version and
+                    not all(self.warehouse_grid.is_walkable(x, y) for x, y in path)):
+                continue
+            apply(path)
+    
+    def invalidate_blocked_paths(self, cells: Iterable[Tuple[int, int]]) -> List[int]:
+        """
+        Drop the paths that run through cells that are no longer walkable.
+        
+        Affected robots are looked up in the path index, so only they plan
+        again (on their next update); every other robot keeps its path.
+        
+        Args:
+            cells: (x, y) positions whose cell type changed
+        
+        Returns:
+            IDs of the robots whose paths were dropped
+        """
+        blocked = [cell for cell in cells if not self.warehouse_grid.is_walkable(cell[0], cell[1])]
+        affected = self.path_index.robots_crossing(blocked)
+        for robot in self.robots:
+            if robot.id in affected:
+                robot.path = []
+                if self.cooperative_planning:
+                    self.reservations.release(robot.id)
+        if affected:
+            print(f"↻ Replanning robots {sorted(affected)} around {blocked}")
+        return sorted(affected)
+    
+    def _return_home(self, robot: Robot, occupied_positions: Set[Tuple[int, int]]) -> bool:
+        """
+        Move a returning robot one step toward the starting station.
+        
+        Outside cooperative mode, returning robots share the station's flow
+        field (its precomputed distance field) and read their next step from it
+        every update, sidestepping occupied cells, instead of each planning a
+        path. Cooperative mode, or a robot stranded off the field, plans a path.
+        
+        Args:
+            robot: Robot returning to the starting station
+            occupied_positions: Set of occupied grid positions
+        
+        Returns:
+            True once the robot is at the starting station
+        """
+        starting_station = self.warehouse_grid.get_starting_station()
+        if not starting_station:
+            return False
+        position = (robot.x, robot.y)
+        if position == starting_station:
+            return True
+        
+        occupied = occupied_positions - {position}
+        if not self.cooperative_planning:
+            step = self.pathfinder.flow_step(position, starting_station, occupied)
+            if step is not None:
+                robot.path = [step]
+        
+        if robot.path:
+            robot.move_along_path()
+            return (robot.x, robot.y) == starting_station
+        
+        def apply(path):
+            if path:
+                robot.path = path
+        
+        self._request_path(robot, starting_station, occupied, apply)
+        return False
+    
     def update_fleet(self):
         """Update all robots' positions, status, battery levels, handle charging logic, and manage jobs."""
+        self.tick += 1
+        if self.cooperative_planning:
+            self.reservations.prune(self.tick - 1)
+        if self.planning_budget is not None:
+            self._budget_left = self.planning_budget
+            # Robots without a path are the ones likely to plan this update
+            self._planners_left = sum(1 for r in self.robots if not r.path and not r.is_dead())
+        
+        # Apply plans finished by the planner pool since the last update
+        if self._pending_plans:
+            self._apply_finished_plans()
+        
         # Generate continuous jobs if enabled
         self._generate_continuous_jobs()
         
@@ -162,11 +401,20 @@ class FleetManager:
         # Get occupied positions (excluding the robot itself)
         occupied_positions = {(r.x, r.y) for r in self.robots}
         
+        # Path progress before moving, to spot robots that die or stall on a reserved path
+        progress = {}
+        if self.cooperative_planning:
+            progress = {robot.id: (robot.path, len(robot.path), robot.is_dead()) for robot in self.robots}
+        
         for robot in self.robots:
             # Skip dead robots
             if robot.is_dead():
                 continue
             
+            # Robots waiting for the planner pool stay put
+            if robot.status == RobotStatus.PLANNING:
+                continue
+            
             # Handle robots at charging stations
             if self.warehouse_grid.is_charging_station(robot.x, robot.y):
                 if robot.status == RobotStatus.CHARGING or robot.needs_charging():
@@ -184,6 +432,13 @@ class FleetManager:
             
             # Check if robot needs charging urgently (battery < 15%)
             if robot.needs_charging(15) and not robot.has_job():
+                # A task is paused, not walked on flat
+                if robot.has_task():
+                    robot.interrupt_task_for_charging()
+                # Already on its way to a charging station
+                if robot.path and self.warehouse_grid.is_charging_station(*robot.path[-1]):
+                    robot.move_along_path()
+                    continue
                 nearest_station = self.warehouse_grid.find_nearest_charging_station(robot.x, robot.y)
                 if nearest_station:
                     # Create emergency charging task
@@ -214,11 +469,57 @@ class FleetManager:
                     if starting_station and (robot.x, robot.y) != starting_station:
                         # Return to starting station
                         robot.status = RobotStatus.RETURNING_TO_START
-                        occupied = occupied_positions - {(robot.x, robot.y)}
-                        path = self.pathfinder.find_path((robot.x, robot.y), starting_station, occupied)
-                        if path:
-                            robot.path = path
-
+                        robot.path = []
+                if robot.status == RobotStatus.RETURNING_TO_START:
+                    if self._return_home(robot, occupied_positions):
+                        robot.status = RobotStatus.IDLE
+        
+        # Tasks cancelled because their robot's battery died are failed, not left active
+        for task in [t for t in self.active_tasks if t.status == TaskStatus.CANCELLED]:
+            task.fail("Robot battery depleted")
+            self.failed_tasks.append(task)
+            self.active_tasks.remove(task)
+        
+        # Fold this update's positions into the traffic costs used by later plans
+        if self.congestion is not None:
+            self.congestion.record((robot.x, robot.y) for robot in self.robots)
+            extra_costs = self.congestion.extra_costs()
+            self.pathfinder.set_congestion(extra_costs)
+            if self.planner_pool is not None:
+                self.planner_pool.set_congestion(extra_costs)
+        
+        if self.cooperative_planning:
+            self._hold_stopped_robots(progress)
+    
+    def _hold_stopped_robots(self, progress: Dict[int, Tuple]):
+        """
+        Keep the reservation table in line with where robots actually stand.
+        
+        Robots without a path hold their cell. A robot that died this update,
+        or did not take a step of its path, is off its reserved timeline, so it
+        drops the path and parks where it stopped; robots planned through that
+        cell drop their paths too and plan again.
+        
+        Args:
+            progress: robot_id -> (path, remaining length, dead) before this update's moves
+        """
+        stopped_cells = set()
+        for robot in self.robots:
+            path, remaining, was_dead = progress.get(robot.id, (None, 0, False))
+            died = robot.is_dead() and not was_dead
+            stalled = bool(robot.path) and robot.path is path and len(robot.path) == remaining
+            if died or stalled or (robot.path and robot.is_dead()):
+                robot.path = []
+                if not self.warehouse_grid.is_static_target(robot.x, robot.y):
+                    stopped_cells.add((robot.x, robot.y))
+        
+        crossing = self.path_index.robots_crossing(stopped_cells)
+        for robot in self.robots:
+            if robot.id in crossing and not robot.is_dead():
+                robot.path = []
+            if not robot.path:
+                self.pathfinder.hold_position(self.reservations, robot.id,
+                                              (robot.x, robot.y), self.tick)
     
     def _update_robot_with_task(self, robot: Robot, occupied_positions: Set[Tuple[int, int]]):
         """
@@ -233,7 +534,8 @@ class FleetManager:
         # If robot has a path, follow it
         if robot.path:
             reached_end = robot.move_along_path()
-            if reached_end:
+            # A partial (budget-limited) path can end short of the target
+            if reached_end and (robot.x, robot.y) == task.get_target():
                 # Reached target, complete task
                 robot.status = RobotStatus.WORKING
         else:
@@ -241,22 +543,22 @@ class FleetManager:
             current_pos = (robot.x, robot.y)
             target_pos = task.get_target()
             
-            # Remove current robot from occupied positions for pathfinding
-            occupied_positions.discard(current_pos)
-            path = self.pathfinder.find_path(current_pos, target_pos, occupied_positions)
-            occupied_positions.add(current_pos)
+            def apply(path):
+                if path:
+                    robot.path = path
+                    robot.status = RobotStatus.EN_ROUTE
+                else:
+                    # No path found, mark as failed
+                    task.fail("No path to target")
+                    self.failed_tasks.append(task)
+                    self.active_tasks.remove(task)
+                    robot.current_task = None
+                    robot.status = RobotStatus.IDLE
             
-            if path:
-                robot.path = path
-                robot.status = RobotStatus.EN_ROUTE
-            else:
-                # No path found, mark as failed
-                task.fail("No path to target")
-                self.failed_tasks.append(task)
-                self.active_tasks.remove(task)
-                robot.current_task = None
-                robot.status = RobotStatus.IDLE
-                return
+            # Remove current robot from occupied positions for pathfinding
+            occupied = occupied_positions - {current_pos}
+            self._request_path(robot, target_pos, occupied, apply)
+            return
         
         # Check if robot reached target and is working
         if robot.status == RobotStatus.WORKING:
@@ -293,16 +595,17 @@ class FleetManager:
             robot: Robot to send for charging
             charging_station: (x, y) position of charging station
         """
+        def apply(path):
+            if path:
+                robot.path = path
+                robot.status = RobotStatus.EN_ROUTE  # En route to charging
+                print(f"→ Robot {robot.id} en route to charging station at {charging_station}")
+            else:
+                print(f"✗ Robot {robot.id} cannot find path to charging station")
+        
         # Create path to charging station
         occupied = {(r.x, r.y) for r in self.robots if r.id != robot.id}
-        path = self.pathfinder.find_path((robot.x, robot.y), charging_station, occupied)
-        
-        if path:
-            robot.path = path
-            robot.status = RobotStatus.EN_ROUTE  # En route to charging
-            print(f"→ Robot {robot.id} en route to charging station at {charging_station}")
-        else:
-            print(f"✗ Robot {robot.id} cannot find path to charging station")
+        self._request_path(robot, charging_station, occupied, apply)
     
     def _auto_assign_jobs(self):
         """Automatically assign pending jobs to idle robots"""
@@ -310,25 +613,58 @@ class FleetManager:
         idle_robots = [r for r in self.robots if r.status == RobotStatus.IDLE and 
                       not r.has_job() and not r.has_task() and not r.is_dead()]
         
-        # Assign jobs to idle robots
-        for robot in idle_robots:
-            next_job = self.job_manager.get_next_job()
-            if next_job:
-                self.job_manager.assign_job(next_job, robot.id)
-                robot.assign_job(next_job)
-                # Create path to pickup location
+        # Assign jobs in priority order, each to the first idle robot that can reach its pickup
+        assignments = []
+        starting_station = self.warehouse_grid.get_starting_station()
+        for next_job in list(self.job_manager.pending_jobs):
+            if not idle_robots:
+                break
+            robot = next((r for r in idle_robots
+                          if self.warehouse_grid.are_connected((r.x, r.y), next_job.pickup)), None)
+            if robot is None:
+                # A robot walled into a pocket is the unreachable side; only reject jobs
+                # whose pickup is also cut off from the starting station
+                if not (starting_station and
+                        self.warehouse_grid.are_connected(starting_station, next_job.pickup)):
+                    self.job_manager.reject_job(next_job, "Pickup location is unreachable")
+                continue
+            idle_robots.remove(robot)
+            self.job_manager.assign_job(next_job, robot.id)
+            robot.assign_job(next_job)
+            assignments.append((robot, next_job))
+        
+        # Plan the whole dispatch wave together so robots do not block each other
+        # (the robots take their first step during this same update)
+        if self.cooperative_planning and len(assignments) > 1:
+            planned = self.pathfinder.find_paths_batch(
+                {robot.id: ((robot.x, robot.y), job.pickup) for robot, job in assignments},
+                self.reservations, self.tick - 1
+            )
+        else:
+            planned = None
+        
+        for robot, next_job in assignments:
+            # Create path to pickup location
+            if planned is not None:
+                self._start_job_path(robot, next_job, planned[robot.id])
+            else:
                 occupied = {(r.x, r.y) for r in self.robots if r.id != robot.id}
-                path = self.pathfinder.find_path((robot.x, robot.y), next_job.pickup, occupied)
-                if path:
-                    robot.path = path
-                    robot.status = RobotStatus.EN_ROUTE
-                    next_job.start_pickup()
-                else:
-                    # Cannot reach pickup, fail job
-                    self.job_manager.fail_job(next_job, "Cannot reach pickup location")
-                    robot.current_job = None
-                    robot.status = RobotStatus.ERROR
-                    robot.last_error = "Cannot reach pickup location"
+                self._request_path(robot, next_job.pickup, occupied,
+                                   partial(self._start_job_path, robot, next_job),
+                                   depart_tick=self.tick - 1)
+    
+    def _start_job_path(self, robot: Robot, job: Job, path: Optional[List[Tuple[int, int]]]):
+        """Send a robot with a newly assigned job toward its pickup, or fail the job."""
+        if path:
+            robot.path = path
+            robot.status = RobotStatus.EN_ROUTE
+            job.start_pickup()
+        else:
+            # Cannot reach pickup, fail job
+            self.job_manager.fail_job(job, "Cannot reach pickup location")
+            robot.current_job = None
+            robot.status = RobotStatus.ERROR
+            robot.last_error = "Cannot reach pickup location"
     
     def _update_robot_with_job(self, robot: Robot, occupied_positions: Set[Tuple[int, int]]):
         """
@@ -343,21 +679,11 @@ class FleetManager:
         
         # Handle returning to start
         if robot.status == RobotStatus.RETURNING_TO_START:
-            if robot.path:
-                reached = robot.move_along_path()
-                if reached:
-                    # Reached starting station
-                    robot.complete_job()
-                    self.job_manager.complete_job(job)
-                    print(f"✓ Robot {robot.id} returned to starting station, job complete")
-            else:
-                # Generate path to starting station
-                starting_station = self.warehouse_grid.get_starting_station()
-                if starting_station:
-                    occupied = occupied_positions - {(robot.x, robot.y)}
-                    path = self.pathfinder.find_path((robot.x, robot.y), starting_station, occupied)
-                    if path:
-                        robot.path = path
+            if self._return_home(robot, occupied_positions):
+                # Reached starting station
+                robot.complete_job()
+                self.job_manager.complete_job(job)
+                print(f"✓ Robot {robot.id} returned to starting station, job complete")
             return
         
         # Handle pickup action
@@ -368,16 +694,19 @@ class FleetManager:
             if time.time() - robot.action_start_time >= 1.5:
                 robot.complete_pickup()
                 job.start_transit()
+                
+                def apply(path):
+                    if path:
+                        robot.path = path
+                        robot.status = RobotStatus.EN_ROUTE
+                    else:
+                        self.job_manager.fail_job(job, "Cannot reach delivery location")
+                        robot.current_job = None
+                        robot.status = RobotStatus.ERROR
+                
                 # Generate path to delivery location
                 occupied = occupied_positions - {(robot.x, robot.y)}
-                path = self.pathfinder.find_path((robot.x, robot.y), job.delivery, occupied)
-                if path:
-                    robot.path = path
-                    robot.status = RobotStatus.EN_ROUTE
-                else:
-                    self.job_manager.fail_job(job, "Cannot reach delivery location")
-                    robot.current_job = None
-                    robot.status = RobotStatus.ERROR
+                self._request_path(robot, job.delivery, occupied, apply)
             return
         
         # Handle dropoff action
@@ -388,20 +717,16 @@ class FleetManager:
             if time.time() - robot.action_start_time >= 1.5:
                 robot.complete_dropoff()
                 job.start_dropoff()
-                # Generate path back to starting station
-                starting_station = self.warehouse_grid.get_starting_station()
-                if starting_station:
-                    occupied = occupied_positions - {(robot.x, robot.y)}
-                    path = self.pathfinder.find_path((robot.x, robot.y), starting_station, occupied)
-                    if path:
-                        robot.path = path
-                        robot.status = RobotStatus.RETURNING_TO_START
+                # The trip back is handled by _return_home from the next update
+                robot.path = []
             return
         
         # Handle movement along path
         if robot.path:
             reached = robot.move_along_path()
-            if reached:
+            target = job.pickup if not robot.pickup_complete else job.delivery
+            # A partial (budget-limited) path can end short of the target
+            if reached and (robot.x, robot.y) == target:
                 # Reached destination
                 if not robot.pickup_complete:
                     # Reached pickup location
@@ -415,24 +740,23 @@ class FleetManager:
             # No path, generate one
             if not robot.pickup_complete:
                 # Going to pickup
-                occupied = occupied_positions - {(robot.x, robot.y)}
-                path = self.pathfinder.find_path((robot.x, robot.y), job.pickup, occupied)
-                if path:
-                    robot.path = path
-                else:
-                    self.job_manager.fail_job(job, "Lost path to pickup")
-                    robot.current_job = None
-                    robot.status = RobotStatus.ERROR
+                target, error = job.pickup, "Lost path to pickup"
             elif not robot.dropoff_complete:
                 # Going to delivery
-                occupied = occupied_positions - {(robot.x, robot.y)}
-                path = self.pathfinder.find_path((robot.x, robot.y), job.delivery, occupied)
+                target, error = job.delivery, "Lost path to delivery"
+            else:
+                return
+            
+            def apply(path):
                 if path:
                     robot.path = path
                 else:
-                    self.job_manager.fail_job(job, "Lost path to delivery")
+                    self.job_manager.fail_job(job, error)
                     robot.current_job = None
                     robot.status = RobotStatus.ERROR
+            
+            occupied = occupied_positions - {(robot.x, robot.y)}
+            self._request_path(robot, target, occupied, apply)
     
     def reset_fleet(self):
         """Reset all robots to starting station and clear all tasks/jobs."""
@@ -442,11 +766,19 @@ class FleetManager:
                 robot.reset(starting_station[0], starting_station[1])
             else:
                 robot.reset()
+            self.pathfinder.forget_agent(robot.id)
         # Clear all tasks and jobs
         self.active_tasks.clear()
         self.completed_tasks.clear()
         self.failed_tasks.clear()
         self.low_battery_alerts.clear()
+        self.reservations.clear()
+        self._pending_plans.clear()
+        if self.congestion is not None:
+            self.congestion.clear()
+            self.pathfinder.set_congestion(None)
+            if self.planner_pool is not None:
+                self.planner_pool.set_congestion(None)
         self.job_manager.reset()
         print("✓ Fleet reset: All robots returned to starting station, tasks and jobs cleared")
     
@@ -657,6 +989,14 @@ class FleetManager:
             self._simulation_thread.join(timeout=5)
         print("✓ Simulation stopped")
     
+    def shutdown(self):
+        """Stop the simulation loop and release the planner pool's workers."""
+        if self._simulation_thread is not None and self._simulation_thread.is_alive():
+            self.stop_simulation()
+        if self.planner_pool is not None:
+            self.planner_pool.shutdown()
+            self.planner_pool = None
+    
     def _simulation_loop(self):
         """Background loop that updates the fleet periodically."""
         print("🤖 Fleet simulation loop started")
@@ -54,7 +54,7 @@ function App() {
   // Fetch environment data
   const fetchEnvironment = useCallback(async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/environment`);
+      const response = await fetch(`${API_BASE_URL}/environment?include_grid=false`);
       if (!response.ok) throw new Error('Failed to fetch environment');
       const data = await response.json();
       setEnvironment(data);
@@ -17,16 +17,24 @@ const EnvironmentGrid = ({ robots = [], environment = null, gridSize = 20 }) =>
     );
   }
 
-  const { grid, width, height, charging_stations, delivery_zones, pickup_zones, starting_stations, obstacles } = environment;
+  const { tiles = [], tile_size, cell_types = [], width, height, charging_stations, delivery_zones, pickup_zones, starting_stations, obstacles } = environment;
+
+  // Populated tiles keyed by "tileX,tileY"; cells outside every tile are empty
+  const tileLookup = {};
+  tiles.forEach((tile) => {
+    tileLookup[`${tile.x},${tile.y}`] = tile.cells;
+  });
 
   /**
    * Get cell type for a specific position
    */
   const getCellType = (x, y) => {
-    if (!grid || y >= grid.length || x >= grid[y].length) {
+    const cells = tile_size ? tileLookup[`${Math.floor(x / tile_size)},${Math.floor(y / tile_size)}`] : null;
+    const row = cells && cells[y % tile_size];
+    if (!row || (x % tile_size) >= row.length) {
       return 'empty';
     }
-    return grid[y][x];
+    return cell_types[row[x % tile_size]] || 'empty';
   };
 
   /**
@@ -73,6 +81,8 @@ const EnvironmentGrid = ({ robots = [], environment = null, gridSize = 20 }) =>
         return '#06b6d4'; // Cyan
       case 'error':
         return '#ef4444'; // Red
+      case 'planning':
+        return '#94a3b8'; // Slate
       default:
         return '#6b7280'; // Gray
     }
@@ -94,13 +104,34 @@ const EnvironmentGrid = ({ robots = [], environment = null, gridSize = 20 }) =>
     return <Battery size={16} className="battery-icon normal" />;
   };
 
+  /**
+   * Expand a robot's path waypoints (corner points) into the cells between them
+   */
+  const expandPath = (robot) => {
+    const cells = [];
+    let x = robot.x;
+    let y = robot.y;
+    robot.path.forEach(([wayX, wayY]) => {
+      if (wayX === x && wayY === y) {
+        cells.push([x, y]); // Planned wait
+        return;
+      }
+      while (x !== wayX || y !== wayY) {
+        x += Math.sign(wayX - x);
+        y += Math.sign(wayY - y);
+        cells.push([x, y]);
+      }
+    });
+    return cells;
+  };
+
   /**
    * Render robot path if it exists
    */
   const renderPath = (robot) => {
     if (!robot.path || robot.path.length === 0) return null;
 
-    return robot.path.map((pos, index) => {
+    return expandPath(robot).map((pos, index) => {
       const [pathX, pathY] = pos;
       return (
         <motion.div
@@ -1,5 +1,6 @@
 """Models package for robot definitions."""
 from .robot import Robot, RobotStatus
+from .path import WaypointPath
 from .task import Task, TaskType, TaskStatus
 from .schemas import (
     RobotResponse, 
@@ -12,6 +13,7 @@ from .schemas import (
 __all__ = [
     'Robot', 
     'RobotStatus',
+    'WaypointPath',
     'Task',
     'TaskType',
     'TaskStatus',
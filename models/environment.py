@@ -3,9 +3,16 @@ Warehouse Environment Model
 Defines the warehouse grid with different cell types (empty, obstacle, charging station, delivery zone)
 """
 
+from collections import OrderedDict, deque
+from collections.abc import Sequence
 from enum import Enum
-from typing import List, Tuple, Optional, Dict
+from typing import Iterable, Iterator, List, Tuple, Optional, Dict, Set
 import random
+import threading
+
+import numpy as np
+
+from models.spatial_index import BucketIndex
 
 
 class CellType(str, Enum):
@@ -18,41 +25,300 @@ class CellType(str, Enum):
     STARTING_STATION = "starting_station"
 
 
+# Compact uint8 codes for cell storage, in declaration order (EMPTY == 0)
+CELL_TYPES: Tuple[CellType, ...] = tuple(CellType)
+CELL_CODES: Dict[CellType, int] = {cell_type: code for code, cell_type in enumerate(CELL_TYPES)}
+_CELL_VALUES = np.array([cell_type.value for cell_type in CELL_TYPES], dtype=object)
+
+# Side length of the square tiles cell types are stored in; all-empty tiles are never allocated
+TILE_SIZE = 64
+
+
+def _label_tile(open_cells: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Label the 4-connected components of a tile's open cells.
+    
+    Every open cell starts with its own flat index as label and repeatedly
+    takes the smallest label among its open neighbors; since each label is
+    the index of a cell in the same component, labels are also chased
+    through the cells they point to, which collapses long corridors quickly.
+    
+    Args:
+        open_cells: (rows, cols) boolean walkability of the tile
+    
+    Returns:
+        (labels, count): int16 local labels 0..count-1 (-1 on blocked cells)
+        and the number of components
+    """
+    rows, cols = open_cells.shape
+    size = rows * cols
+    labels = np.where(open_cells, np.arange(size).reshape(rows, cols), size)
+    vertical = open_cells[:-1, :] & open_cells[1:, :]
+    horizontal = open_cells[:, :-1] & open_cells[:, 1:]
+    while True:
+        previous = labels.copy()
+        labels[1:, :] = np.where(vertical, np.minimum(labels[1:, :], labels[:-1, :]), labels[1:, :])
+        labels[:-1, :] = np.where(vertical, np.minimum(labels[:-1, :], labels[1:, :]), labels[:-1, :])
+        labels[:, 1:] = np.where(horizontal, np.minimum(labels[:, 1:], labels[:, :-1]), labels[:, 1:])
+        labels[:, :-1] = np.where(horizontal, np.minimum(labels[:, :-1], labels[:, 1:]), labels[:, :-1])
+        flat = labels.ravel()
+        inside = flat < size
+        flat[inside] = flat[flat[inside]]
+        if np.array_equal(labels, previous):
+            break
+    
+    local = np.full(size, -1, dtype=np.int16)
+    roots, local[inside] = np.unique(flat[inside], return_inverse=True)
+    return local.reshape(rows, cols), len(roots)
+
+# Fixed cells that robots route to repeatedly; each gets a cached distance field
+STATIC_TARGET_TYPES = frozenset({
+    CellType.CHARGING_STATION,
+    CellType.DELIVERY_ZONE,
+    CellType.PICKUP_ZONE,
+    CellType.STARTING_STATION,
+})
+
+
+class CellSet(Sequence):
+    """
+    Insertion-ordered set of grid positions.
+    
+    Membership tests, additions and removals are O(1) (it is backed by a
+    dict) and iteration follows insertion order. It is also a read-only
+    Sequence: positional indexing (random.choice, random.sample, [0]) reads
+    a tuple cached until the next change.
+    append is an alias of add, so a position is never listed twice.
+    """
+    
+    def __init__(self, positions: Iterable[Tuple[int, int]] = ()):
+        self._positions: Dict[Tuple[int, int], None] = dict.fromkeys(positions)
+        self._ordered: Optional[Tuple[Tuple[int, int], ...]] = None
+    
+    def __contains__(self, position) -> bool:
+        return position in self._positions
+    
+    def __len__(self) -> int:
+        return len(self._positions)
+    
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(self._positions)
+    
+    def __getitem__(self, index):
+        if self._ordered is None:
+            self._ordered = tuple(self._positions)
+        return self._ordered[index]
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (CellSet, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"CellSet({list(self._positions)})"
+    
+    def add(self, position: Tuple[int, int]):
+        """Add a position at the end (no-op if already present)"""
+        if position not in self._positions:
+            self._positions[position] = None
+            self._ordered = None
+    
+    append = add
+    
+    def remove(self, position: Tuple[int, int]):
+        """Remove a position, raising ValueError if it is not present (like list.remove)"""
+        if position not in self._positions:
+            raise ValueError(f"{position} is not in the set")
+        self.discard(position)
+    
+    def discard(self, position: Tuple[int, int]):
+        """Remove a position if present"""
+        if self._positions.pop(position, 0) is None:
+            self._ordered = None
+    
+    def clear(self):
+        """Remove every position"""
+        self._positions.clear()
+        self._ordered = None
+    
+    def copy(self) -> 'CellSet':
+        """Get an independent copy"""
+        return CellSet(self._positions)
+    
+    def to_list(self) -> List[Tuple[int, int]]:
+        """Get the positions as a list (e.g. for JSON serialization)"""
+        return list(self._positions)
+
+
 class WarehouseGrid:
     """
     Represents the warehouse environment as a 2D grid.
     Manages cell types, charging stations, delivery zones, and obstacles.
+    
+    Cell types are stored as uint8 codes in TILE_SIZE x TILE_SIZE tiles that
+    are only allocated once they hold a non-empty cell, so their memory and
+    serialized size follow the populated area rather than the bounding box.
+    Walkability and connected components are derived from the tiles too;
+    the dense walkability mask planners read is only built when first asked for.
     """
     
-    def __init__(self, width: int = 20, height: int = 20):
+    # Distance fields kept (least recently used dropped first); each is 8 bytes per cell
+    MAX_DISTANCE_FIELDS = 16
+    
+    def __init__(self, width: int = 20, height: int = 20, default_features: bool = True):
         self.width = width
         self.height = height
-        self.grid: List[List[CellType]] = []
-        self.charging_stations: List[Tuple[int, int]] = []
-        self.delivery_zones: List[Tuple[int, int]] = []
-        self.pickup_zones: List[Tuple[int, int]] = []
-        self.starting_stations: List[Tuple[int, int]] = []
-        self.obstacles: List[Tuple[int, int]] = []
+        self._walkable: Optional[np.ndarray] = None
+        # Snapshots refuse edits
+        self._frozen = False
+        self.charging_stations = CellSet()
+        self.delivery_zones = CellSet()
+        self.pickup_zones = CellSet()
+        self.starting_stations = CellSet()
+        self.obstacles = CellSet()
+        
+        # Incremented whenever a cell changes walkability (planners key caches on it)
+        self.version = 0
+        
+        # Populated tiles: (tile_x, tile_y) -> uint8 codes, plus their non-empty cell counts
+        # (tiles viewing an array passed to from_cells are clipped at the grid edge)
+        self._tiles: Dict[Tuple[int, int], np.ndarray] = {}
+        self._tile_counts: Dict[Tuple[int, int], int] = {}
+        
+        # Incremented on every cell-type change; each tile is stamped with the value of its last change
+        self.cell_revision = 0
+        self._tile_versions: Dict[Tuple[int, int], int] = {}
+        
+        # Recent walkability flips as (version, x, y), for incremental planners
+        self._change_log: deque = deque(maxlen=4096)
+        
+        # Reverse-BFS fields per target in LRU order: target -> (distance, next_hop), flat int32 arrays
+        self._distance_fields: 'OrderedDict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]]' = OrderedDict()
+        self._fields_version = -1
+        
+        # Connected components, relabeled lazily after walkability flips: each populated tile's
+        # local labels (tile -> (tile version, int16 labels, count)) are numbered from the tile's
+        # base node, an empty tile is a single node, and nodes map to their component
+        self._tile_labels: Dict[Tuple[int, int], Tuple[int, np.ndarray, int]] = {}
+        self._component_bases: np.ndarray = np.zeros((0, 0), dtype=np.int64)
+        self._node_components: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._components_dirty = True
+        
+        # Bucketed spatial index per station/zone type, kept in sync by set_cell_type
+        self._target_index: Dict[CellType, BucketIndex] = {
+            cell_type: BucketIndex(width, height) for cell_type in STATIC_TARGET_TYPES
+        }
+        
+        # Walking-distance Voronoi map per station/zone type: type -> (owner, distance), flat int32 arrays
+        self._ownership_maps: Dict[CellType, Tuple[np.ndarray, np.ndarray]] = {}
+        self._ownership_version = -1
+        
+        # Guards the field and ownership caches, which planner threads share on a snapshot
+        self._cache_lock = threading.Lock()
         
         # Initialize grid with empty cells
         self._initialize_grid()
         
         # Add default environment features
-        self._add_default_features()
+        if default_features:
+            self._add_default_features()
+    
+    @classmethod
+    def from_cells(cls, cells: np.ndarray,
+                   populated: Optional[Iterable[Tuple[int, int]]] = None) -> 'WarehouseGrid':
+        """
+        Build a grid whose tiles view an existing array of cell-type codes.
+        
+        Populated tiles are slices of the array, not copies, so a memory-mapped
+        layout is used in place and only its populated tiles are ever read.
+        Edits to cells in those tiles land in the array (for a copy-on-write
+        map, in the process's private copy of the page, never in the file).
+        Tiles that are empty in the array, or become empty and are dropped, are
+        reallocated in memory when edited, so the array is not a complete record
+        of later edits; write the grid out with save_layout to persist them.
+        
+        Args:
+            cells: (height, width) uint8 array of CELL_CODES values
+            populated: Keys of the tiles that may hold non-empty cells
+                (default: None, scan every tile)
+            
+        Returns:
+            Grid without default features
+        """
+        if cells.ndim != 2 or cells.dtype != np.uint8:
+            raise ValueError(f"Expected a 2D uint8 cell array, got {cells.ndim}D {cells.dtype}")
+        
+        height, width = cells.shape
+        grid = cls(width, height, default_features=False)
+        if populated is None:
+            populated = [(tile_x, tile_y)
+                         for tile_y in range(-(-height // TILE_SIZE))
+                         for tile_x in range(-(-width // TILE_SIZE))]
+        
+        empty = CELL_CODES[CellType.EMPTY]
+        for tile_x, tile_y in sorted(populated, key=lambda key: (key[1], key[0])):
+            x0, y0 = tile_x * TILE_SIZE, tile_y * TILE_SIZE
+            if not grid.is_valid_position(x0, y0):
+                raise ValueError(f"Tile ({tile_x}, {tile_y}) is outside the grid")
+            tile = cells[y0:y0 + TILE_SIZE, x0:x0 + TILE_SIZE]
+            ys, xs = np.nonzero(tile != empty)
+            if not len(xs):
+                continue
+            codes = tile[ys, xs]
+            if codes.max() >= len(CELL_TYPES):
+                raise ValueError(f"Unknown cell code {codes.max()} in tile ({tile_x}, {tile_y})")
+            
+            grid._tiles[(tile_x, tile_y)] = tile
+            grid._tile_counts[(tile_x, tile_y)] = len(xs)
+            for x, y, code in zip((xs + x0).tolist(), (ys + y0).tolist(), codes.tolist()):
+                cell_type = CELL_TYPES[code]
+                grid._tracked_positions(cell_type).add((x, y))
+                if cell_type in grid._target_index:
+                    grid._target_index[cell_type].add((x, y))
+        return grid
     
     def _initialize_grid(self):
         """Initialize the grid with all empty cells"""
-        self.grid = [
-            [CellType.EMPTY for _ in range(self.width)]
-            for _ in range(self.height)
-        ]
+        self._tiles = {}
+        self._tile_counts = {}
+        self._walkable = None
+        self._tile_labels = {}
+        self._components_dirty = True
+    
+    @property
+    def cells(self) -> np.ndarray:
+        """Dense (height, width) array of cell-type codes, assembled from the tiles (a copy)"""
+        dense = np.full((self.height, self.width), CELL_CODES[CellType.EMPTY], dtype=np.uint8)
+        for (tile_x, tile_y), tile in self._tiles.items():
+            x0, y0 = tile_x * TILE_SIZE, tile_y * TILE_SIZE
+            rows, cols = min(TILE_SIZE, self.height - y0), min(TILE_SIZE, self.width - x0)
+            dense[y0:y0 + rows, x0:x0 + cols] = tile[:rows, :cols]
+        return dense
+    
+    @property
+    def walkable(self) -> np.ndarray:
+        """Dense (height, width) walkability mask for planners, built from the tiles on first use"""
+        if self._walkable is None:
+            mask = np.ones((self.height, self.width), dtype=bool)
+            obstacle = CELL_CODES[CellType.OBSTACLE]
+            for (tile_x, tile_y), tile in self._tiles.items():
+                x0, y0 = tile_x * TILE_SIZE, tile_y * TILE_SIZE
+                rows, cols = min(TILE_SIZE, self.height - y0), min(TILE_SIZE, self.width - x0)
+                mask[y0:y0 + rows, x0:x0 + cols] = tile[:rows, :cols] != obstacle
+            mask.flags.writeable = not self._frozen
+            self._walkable = mask
+        return self._walkable
+    
+    @property
+    def grid(self) -> List[List[CellType]]:
+        """Nested-list view of the cell types (built on demand; prefer get_cell_type)"""
+        return [[CELL_TYPES[code] for code in row] for row in self.cells.tolist()]
     
     def _add_default_features(self):
         """Add default charging stations, delivery zones, pickup zones, starting station, and obstacles"""
         # Add starting station (center of grid)
         center_x, center_y = self.width // 2, self.height // 2
         self.set_cell_type(center_x, center_y, CellType.STARTING_STATION)
-        self.starting_stations.append((center_x, center_y))
         
         # Add charging stations (4 corners)
         charging_positions = [
@@ -64,7 +330,6 @@ class WarehouseGrid:
         
         for x, y in charging_positions:
             self.set_cell_type(x, y, CellType.CHARGING_STATION)
-            self.charging_stations.append((x, y))
         
         # Add pickup zones (left and top sides)
         pickup_positions = [
@@ -77,7 +342,6 @@ class WarehouseGrid:
         for x, y in pickup_positions:
             if self.is_valid_position(x, y) and self.get_cell_type(x, y) == CellType.EMPTY:
                 self.set_cell_type(x, y, CellType.PICKUP_ZONE)
-                self.pickup_zones.append((x, y))
         
         # Add delivery zones (right and bottom sides)
         delivery_positions = [
@@ -90,7 +354,6 @@ class WarehouseGrid:
         for x, y in delivery_positions:
             if self.is_valid_position(x, y) and self.get_cell_type(x, y) == CellType.EMPTY:
                 self.set_cell_type(x, y, CellType.DELIVERY_ZONE)
-                self.delivery_zones.append((x, y))
         
         # Add some random obstacles (about 5-8% of grid)
         num_obstacles = int(self.width * self.height * 0.05)
@@ -107,7 +370,6 @@ class WarehouseGrid:
             if (self.get_cell_type(x, y) == CellType.EMPTY and 
                 abs(x - center_x) > 2 and abs(y - center_y) > 2):
                 self.set_cell_type(x, y, CellType.OBSTACLE)
-                self.obstacles.append((x, y))
                 added += 1
     
     def is_valid_position(self, x: int, y: int) -> bool:
@@ -118,55 +380,276 @@ class WarehouseGrid:
         """Get the type of cell at given position"""
         if not self.is_valid_position(x, y):
             return None
-        return self.grid[y][x]
+        tile = self._tiles.get((x // TILE_SIZE, y // TILE_SIZE))
+        if tile is None:
+            return CellType.EMPTY
+        return CELL_TYPES[tile[y % TILE_SIZE, x % TILE_SIZE]]
     
     def set_cell_type(self, x: int, y: int, cell_type: CellType) -> bool:
         """Set the type of cell at given position"""
         if not self.is_valid_position(x, y):
             return False
+        if self._frozen:
+            raise ValueError("cannot edit a read-only grid snapshot")
         
-        old_type = self.grid[y][x]
-        self.grid[y][x] = cell_type
+        old_type = self.get_cell_type(x, y)
+        if old_type != cell_type:
+            self._write_tile_cell(x, y, CELL_CODES[cell_type], CELL_CODES[old_type])
         
-        # Update tracking lists
+        # Keep the walkability mask (if built) in sync and bump the layout version if it flipped
+        walkable = cell_type != CellType.OBSTACLE
+        if (old_type != CellType.OBSTACLE) != walkable:
+            if self._walkable is not None:
+                self._walkable[y, x] = walkable
+            self.version += 1
+            self._change_log.append((self.version, x, y))
+            self._components_dirty = True
+        
+        # Update tracking sets (O(1) each)
         pos = (x, y)
+        old_positions = self._tracked_positions(old_type)
+        if old_positions is not None:
+            old_positions.discard(pos)
+        new_positions = self._tracked_positions(cell_type)
+        if new_positions is not None:
+            new_positions.add(pos)
         
-        # Remove from old tracking list
-        if old_type == CellType.CHARGING_STATION and pos in self.charging_stations:
-            self.charging_stations.remove(pos)
-        elif old_type == CellType.DELIVERY_ZONE and pos in self.delivery_zones:
-            self.delivery_zones.remove(pos)
-        elif old_type == CellType.PICKUP_ZONE and pos in self.pickup_zones:
-            self.pickup_zones.remove(pos)
-        elif old_type == CellType.STARTING_STATION and pos in self.starting_stations:
-            self.starting_stations.remove(pos)
-        elif old_type == CellType.OBSTACLE and pos in self.obstacles:
-            self.obstacles.remove(pos)
-        
-        # Add to new tracking list
-        if cell_type == CellType.CHARGING_STATION and pos not in self.charging_stations:
-            self.charging_stations.append(pos)
-        elif cell_type == CellType.DELIVERY_ZONE and pos not in self.delivery_zones:
-            self.delivery_zones.append(pos)
-        elif cell_type == CellType.PICKUP_ZONE and pos not in self.pickup_zones:
-            self.pickup_zones.append(pos)
-        elif cell_type == CellType.STARTING_STATION and pos not in self.starting_stations:
-            self.starting_stations.append(pos)
-        elif cell_type == CellType.OBSTACLE and pos not in self.obstacles:
-            self.obstacles.append(pos)
+        # Keep the station spatial index in sync; ownership maps of the types involved go stale
+        if old_type in self._target_index:
+            self._target_index[old_type].remove(pos)
+            self._ownership_maps.pop(old_type, None)
+        if cell_type in self._target_index:
+            self._target_index[cell_type].add(pos)
+            self._ownership_maps.pop(cell_type, None)
         
         return True
     
+    def _write_tile_cell(self, x: int, y: int, code: int, old_code: int):
+        """Store a cell code, allocating its tile on demand and freeing it once all-empty"""
+        key = (x // TILE_SIZE, y // TILE_SIZE)
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = np.full((TILE_SIZE, TILE_SIZE), CELL_CODES[CellType.EMPTY], dtype=np.uint8)
+            self._tiles[key] = tile
+            self._tile_counts[key] = 0
+        tile[y % TILE_SIZE, x % TILE_SIZE] = code
+        
+        empty = CELL_CODES[CellType.EMPTY]
+        self._tile_counts[key] += (code != empty) - (old_code != empty)
+        if self._tile_counts[key] == 0:
+            del self._tiles[key]
+            del self._tile_counts[key]
+        
+        self.cell_revision += 1
+        self._tile_versions[key] = self.cell_revision
+    
+    def tile_of(self, x: int, y: int) -> Tuple[int, int]:
+        """Get the (tile_x, tile_y) key of the tile holding a cell"""
+        return x // TILE_SIZE, y // TILE_SIZE
+    
+    def populated_tiles(self) -> List[Tuple[int, int]]:
+        """Get the keys of the tiles holding at least one non-empty cell, in row-major order"""
+        return sorted(self._tiles, key=lambda key: (key[1], key[0]))
+    
+    def get_tile(self, tile_x: int, tile_y: int) -> np.ndarray:
+        """
+        Get a copy of a tile's cell-type codes, clipped to the grid bounds.
+        
+        Args:
+            tile_x: Tile column
+            tile_y: Tile row
+            
+        Returns:
+            (rows, cols) uint8 array; all EMPTY codes for an unpopulated tile
+        """
+        x0, y0 = tile_x * TILE_SIZE, tile_y * TILE_SIZE
+        if not self.is_valid_position(x0, y0):
+            raise ValueError(f"Tile ({tile_x}, {tile_y}) is outside the grid")
+        rows, cols = min(TILE_SIZE, self.height - y0), min(TILE_SIZE, self.width - x0)
+        tile = self._tiles.get((tile_x, tile_y))
+        if tile is None:
+            return np.full((rows, cols), CELL_CODES[CellType.EMPTY], dtype=np.uint8)
+        return tile[:rows, :cols].copy()
+    
+    def tile_version(self, tile_x: int, tile_y: int) -> int:
+        """Get the cell revision of a tile's last change (0 if it never changed)"""
+        return self._tile_versions.get((tile_x, tile_y), 0)
+    
+    def tiles_changed_since(self, revision: int) -> List[Tuple[int, int]]:
+        """
+        Get the tiles with a cell-type change after the given cell revision.
+        
+        Lets clients re-sync only the tiles that changed since their copy,
+        including tiles that have since become empty again.
+        """
+        return sorted((key for key, stamp in self._tile_versions.items() if stamp > revision),
+                      key=lambda key: (key[1], key[0]))
+    
+    def _tracked_positions(self, cell_type: CellType) -> Optional[CellSet]:
+        """Get the tracking set for a cell type (None for empty cells)"""
+        if cell_type == CellType.CHARGING_STATION:
+            return self.charging_stations
+        if cell_type == CellType.DELIVERY_ZONE:
+            return self.delivery_zones
+        if cell_type == CellType.PICKUP_ZONE:
+            return self.pickup_zones
+        if cell_type == CellType.STARTING_STATION:
+            return self.starting_stations
+        if cell_type == CellType.OBSTACLE:
+            return self.obstacles
+        return None
+    
     def is_walkable(self, x: int, y: int) -> bool:
         """Check if a robot can move to this cell"""
-        if not self.is_valid_position(x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
             return False
         
-        cell_type = self.get_cell_type(x, y)
-        # Robots can walk on empty cells, charging stations, delivery zones, pickup zones, and starting stations
-        return cell_type in [CellType.EMPTY, CellType.CHARGING_STATION, 
-                            CellType.DELIVERY_ZONE, CellType.PICKUP_ZONE, 
-                            CellType.STARTING_STATION]
+        # Robots can walk on every cell type except obstacles
+        tile = self._tiles.get((x // TILE_SIZE, y // TILE_SIZE))
+        return tile is None or bool(tile[y % TILE_SIZE, x % TILE_SIZE] != CELL_CODES[CellType.OBSTACLE])
+    
+    def changes_since(self, version: int) -> Optional[List[Tuple[int, int]]]:
+        """
+        Get the cells whose walkability flipped after the given version.
+        
+        Args:
+            version: Layout version the caller last saw
+        
+        Returns:
+            List of changed (x, y) positions, or None if the log no longer
+            reaches back that far and the caller must rebuild from scratch
+        """
+        if version == self.version:
+            return []
+        if version > self.version or not self._change_log or self._change_log[0][0] > version + 1:
+            return None
+        return [(x, y) for changed_version, x, y in self._change_log if changed_version > version]
+    
+    def _label_components(self):
+        """
+        Recompute connected components tile by tile.
+        
+        Only tiles changed since they were last labeled are relabeled; an
+        empty tile is one component by itself. Components of neighboring
+        tiles that touch across the shared border are then merged.
+        """
+        tiles_x, tiles_y = -(-self.width // TILE_SIZE), -(-self.height // TILE_SIZE)
+        obstacle = CELL_CODES[CellType.OBSTACLE]
+        tile_labels = {}
+        counts = np.ones((tiles_y, tiles_x), dtype=np.int64)
+        for key, tile in self._tiles.items():
+            cached = self._tile_labels.get(key)
+            version = self._tile_versions.get(key, 0)
+            if cached is None or cached[0] != version:
+                x0, y0 = key[0] * TILE_SIZE, key[1] * TILE_SIZE
+                rows, cols = min(TILE_SIZE, self.height - y0), min(TILE_SIZE, self.width - x0)
+                labels, count = _label_tile(tile[:rows, :cols] != obstacle)
+                cached = (version, labels, count)
+            tile_labels[key] = cached
+            counts[key[1], key[0]] = cached[2]
+        bases = np.cumsum(counts).reshape(tiles_y, tiles_x) - counts
+        
+        # Node pairs that touch across a tile border; two empty tiles always touch
+        populated = np.zeros((tiles_y, tiles_x), dtype=bool)
+        for tile_x, tile_y in tile_labels:
+            populated[tile_y, tile_x] = True
+        empty_pair = ~populated[:, :-1] & ~populated[:, 1:]
+        sources = [bases[:, :-1][empty_pair]]
+        targets = [bases[:, 1:][empty_pair]]
+        empty_pair = ~populated[:-1, :] & ~populated[1:, :]
+        sources.append(bases[:-1, :][empty_pair])
+        targets.append(bases[1:, :][empty_pair])
+        
+        # Borders of populated tiles join the components facing each other
+        borders = set()
+        for tile_x, tile_y in tile_labels:
+            borders.update((((tile_x - 1, tile_y), (tile_x, tile_y)), ((tile_x, tile_y), (tile_x + 1, tile_y)),
+                            ((tile_x, tile_y - 1), (tile_x, tile_y)), ((tile_x, tile_y), (tile_x, tile_y + 1))))
+        for here, there in borders:
+            if min(here) < 0 or there[0] >= tiles_x or there[1] >= tiles_y:
+                continue
+            side = (slice(None), -1) if here[1] == there[1] else (-1, slice(None))
+            other_side = (slice(None), 0) if here[1] == there[1] else (0, slice(None))
+            here_labels = tile_labels[here][1][side] if here in tile_labels else None
+            there_labels = tile_labels[there][1][other_side] if there in tile_labels else None
+            if here_labels is None:
+                here_labels = np.zeros_like(there_labels)
+            if there_labels is None:
+                there_labels = np.zeros_like(here_labels)
+            touching = (here_labels >= 0) & (there_labels >= 0)
+            sources.append(here_labels[touching] + bases[here[1], here[0]])
+            targets.append(there_labels[touching] + bases[there[1], there[0]])
+        
+        # Every node takes the smallest node label across its pairs, chasing labels
+        # through the nodes they name, until both ends of every pair agree
+        sources, targets = np.concatenate(sources), np.concatenate(targets)
+        components = np.arange(int(counts.sum()), dtype=np.int64)
+        while True:
+            lowest = np.minimum(components[sources], components[targets])
+            updated = components.copy()
+            np.minimum.at(updated, sources, lowest)
+            np.minimum.at(updated, targets, lowest)
+            updated = updated[updated]
+            if np.array_equal(updated, components):
+                break
+            components = updated
+        
+        self._tile_labels = tile_labels
+        self._component_bases = bases
+        self._node_components = components
+        self._components_dirty = False
+    
+    def _component_at(self, x: int, y: int) -> int:
+        """Component label of an in-bounds cell from the tile labels (-1 if blocked)"""
+        tile_x, tile_y = x // TILE_SIZE, y // TILE_SIZE
+        entry = self._tile_labels.get((tile_x, tile_y))
+        local = 0 if entry is None else int(entry[1][y % TILE_SIZE, x % TILE_SIZE])
+        if local < 0:
+            return -1
+        return int(self._node_components[self._component_bases[tile_y, tile_x] + local])
+    
+    def get_component(self, x: int, y: int) -> int:
+        """
+        Get the connected-component label of a cell.
+        
+        A blocked cell (e.g. an obstacle dropped under a robot) takes the label
+        of its first walkable neighbor, since that is where it can move to; it
+        may border several components, which are_connected checks in full.
+        
+        Returns:
+            Component label, or -1 if the cell is out of bounds or fully enclosed
+        """
+        if not self.is_valid_position(x, y):
+            return -1
+        if self._components_dirty:
+            self._label_components()
+        label = self._component_at(x, y)
+        if label < 0:
+            for nx, ny in self.get_neighbors(x, y):
+                return self._component_at(nx, ny)
+        return label
+    
+    def _components_around(self, x: int, y: int) -> Set[int]:
+        """Labels a cell can reach: its own, or those of all its walkable neighbors if it is blocked"""
+        if not self.is_valid_position(x, y):
+            return set()
+        if self._components_dirty:
+            self._label_components()
+        label = self._component_at(x, y)
+        if label >= 0:
+            return {label}
+        return {self._component_at(nx, ny) for nx, ny in self.get_neighbors(x, y)}
+    
+    def are_connected(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> bool:
+        """
+        Check in O(1) whether a walkable route can exist between two positions.
+        
+        A blocked cell (e.g. an obstacle dropped under a robot in a doorway)
+        connects to every component it has a walkable neighbor in.
+        """
+        if pos1 == pos2:
+            return True
+        return not self._components_around(*pos1).isdisjoint(self._components_around(*pos2))
     
     def is_charging_station(self, x: int, y: int) -> bool:
         """Check if position is a charging station"""
@@ -184,17 +667,257 @@ class WarehouseGrid:
         """Check if position is a starting station"""
         return self.get_cell_type(x, y) == CellType.STARTING_STATION
     
-    def find_nearest_pickup_zone(self, x: int, y: int) -> Optional[Tuple[int, int]]:
-        """Find the nearest pickup zone using Manhattan distance"""
-        if not self.pickup_zones:
+    def is_static_target(self, x: int, y: int) -> bool:
+        """Check if position is a fixed routing target (station or zone)"""
+        return self.get_cell_type(x, y) in STATIC_TARGET_TYPES
+    
+    def _walkable_bfs(self, sources: List[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Multi-source BFS over walkable cells, one NumPy frontier per distance layer.
+        
+        Args:
+            sources: Flat indices of walkable seed cells
+        
+        Returns:
+            (distance, parent, origin) int32 arrays indexed by y * width + x: steps
+            to the nearest seed, the neighbor one step closer to it and the seed
+            itself (all -1 where no seed is reachable; parent is -1 at the seeds)
+        """
+        width, size = self.width, self.width * self.height
+        walkable = self.walkable.ravel()
+        distance = np.full(size, -1, dtype=np.int32)
+        parent = np.full(size, -1, dtype=np.int32)
+        origin = np.full(size, -1, dtype=np.int32)
+        
+        frontier = np.unique(np.asarray(sources, dtype=np.int64))
+        distance[frontier] = 0
+        origin[frontier] = frontier
+        step = 0
+        while frontier.size:
+            step += 1
+            column = frontier % width
+            froms = (frontier[frontier >= width], frontier[frontier < size - width],
+                     frontier[column > 0], frontier[column < width - 1])
+            cells = np.concatenate((froms[0] - width, froms[1] + width, froms[2] - 1, froms[3] + 1))
+            parents = np.concatenate(froms)
+            fresh = walkable[cells] & (distance[cells] < 0)
+            # A cell reached from several frontier cells keeps the first of them
+            cells, first = np.unique(cells[fresh], return_index=True)
+            parents = parents[fresh][first]
+            distance[cells] = step
+            parent[cells] = parents
+            origin[cells] = origin[parents]
+            frontier = cells
+        return distance, parent, origin
+    
+    def distances_from(self, cells: Iterable[Tuple[int, int]]) -> np.ndarray:
+        """
+        Get the walking distance from every cell to the nearest of some cells, without caching.
+        
+        Unlike get_distance_field, the result is not kept, so callers holding
+        their own distance tables do not evict the station fields.
+        
+        Args:
+            cells: Walkable source cells (x, y); blocked ones are skipped
+        
+        Returns:
+            Flat int32 array indexed by y * width + x (-1 where unreachable)
+        """
+        sources = [y * self.width + x for x, y in cells if self.is_walkable(x, y)]
+        if not sources:
+            return np.full(self.width * self.height, -1, dtype=np.int32)
+        return self._walkable_bfs(sources)[0]
+    
+    def get_distance_field(self, target: Tuple[int, int]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get the reverse-BFS field toward a target, building it on first use.
+        
+        Both arrays are int32 and indexed by y * width + x. The distance array
+        holds the number of steps to the target (-1 if unreachable) and the
+        next-hop array holds the flat index of the neighbor one step closer
+        (-1 at the target). Fields are dropped whenever the walkability layout
+        changes, and at most MAX_DISTANCE_FIELDS are kept.
+        
+        Args:
+            target: Target position (x, y)
+        
+        Returns:
+            (distance, next_hop) arrays, or None if the target is not walkable
+        """
+        with self._cache_lock:
+            if self._fields_version != self.version:
+                self._distance_fields.clear()
+                self._fields_version = self.version
+            
+            field = self._distance_fields.get(target)
+            if field is not None:
+                self._distance_fields.move_to_end(target)
+                return field
+        
+        tx, ty = target
+        if not self.is_walkable(tx, ty):
             return None
         
-        def manhattan_distance(pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
-            return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+        # Built outside the lock, so other threads keep reading built fields meanwhile
+        distance, next_hop, _ = self._walkable_bfs([ty * self.width + tx])
+        field = (distance, next_hop)
+        with self._cache_lock:
+            self._distance_fields[target] = field
+            if len(self._distance_fields) > self.MAX_DISTANCE_FIELDS:
+                self._distance_fields.popitem(last=False)
+        return field
+    
+    def has_distance_field(self, target: Tuple[int, int]) -> bool:
+        """Check if an up-to-date field toward a target is already built"""
+        with self._cache_lock:
+            return self._fields_version == self.version and target in self._distance_fields
+    
+    def distance_to_target(self, x: int, y: int, target: Tuple[int, int]) -> Optional[int]:
+        """Get the walking distance from (x, y) to a target, or None if unreachable"""
+        field = self.get_distance_field(target)
+        if field is None or not self.is_valid_position(x, y):
+            return None
+        distance = int(field[0][y * self.width + x])
+        return distance if distance >= 0 else None
+    
+    def next_step_toward(self, x: int, y: int, target: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """Get the neighbor one step closer to a target, or None if unreachable or already there"""
+        field = self.get_distance_field(target)
+        if field is None or not self.is_valid_position(x, y):
+            return None
+        hop = int(field[1][y * self.width + x])
+        if hop < 0:
+            return None
+        return (hop % self.width, hop // self.width)
+    
+    def path_to_target(self, start: Tuple[int, int], target: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Follow the distance field from start to target.
+        
+        Args:
+            start: Starting position (x, y)
+            target: Target position (x, y)
+        
+        Returns:
+            List of positions excluding start, or None if the target is unreachable
+        """
+        if start == target:
+            return []
+        
+        field = self.get_distance_field(target)
+        if field is None or not self.is_valid_position(start[0], start[1]):
+            return None
         
-        current_pos = (x, y)
-        nearest = min(self.pickup_zones, key=lambda zone: manhattan_distance(current_pos, zone))
-        return nearest
+        next_hop = field[1]
+        current = int(next_hop[start[1] * self.width + start[0]])
+        if current < 0:
+            return None
+        
+        path = []
+        while current >= 0:
+            path.append((current % self.width, current // self.width))
+            current = int(next_hop[current])
+        return path
+    
+    def nearest_targets(self, cell_type: CellType, x: int, y: int, k: int = 1) -> List[Tuple[int, int]]:
+        """
+        Get the k stations or zones of a type closest to (x, y) by Manhattan distance.
+        
+        Args:
+            cell_type: One of STATIC_TARGET_TYPES
+            x: X-coordinate
+            y: Y-coordinate
+            k: Number of targets to return
+        
+        Returns:
+            Up to k (x, y) positions, closest first
+        """
+        if cell_type not in self._target_index:
+            raise ValueError(f"Not a station or zone type: {cell_type}")
+        return self._target_index[cell_type].nearest(x, y, k)
+    
+    def targets_within(self, cell_type: CellType, x: int, y: int, radius: int) -> List[Tuple[int, int]]:
+        """
+        Get the stations or zones of a type within a Manhattan radius of (x, y).
+        
+        Args:
+            cell_type: One of STATIC_TARGET_TYPES
+            x: X-coordinate
+            y: Y-coordinate
+            radius: Maximum Manhattan distance
+        
+        Returns:
+            (x, y) positions, closest first
+        """
+        if cell_type not in self._target_index:
+            raise ValueError(f"Not a station or zone type: {cell_type}")
+        return self._target_index[cell_type].within(x, y, radius)
+    
+    def get_ownership_map(self, cell_type: CellType) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the walking-distance Voronoi map of a station or zone type, building it on first use.
+        
+        A multi-source BFS from every target of the type labels each walkable
+        cell with its closest target and the number of steps to it. Maps are
+        dropped when the walkability layout changes or a target of the type is
+        added or removed.
+        
+        Args:
+            cell_type: One of STATIC_TARGET_TYPES
+        
+        Returns:
+            (owner, distance) int32 arrays indexed by y * width + x, holding the flat
+            index of the closest target and the steps to it (-1 if none is reachable)
+        """
+        if cell_type not in self._target_index:
+            raise ValueError(f"Not a station or zone type: {cell_type}")
+        with self._cache_lock:
+            if self._ownership_version != self.version:
+                self._ownership_maps.clear()
+                self._ownership_version = self.version
+            
+            ownership = self._ownership_maps.get(cell_type)
+            if ownership is not None:
+                return ownership
+        
+        seeds = [ty * self.width + tx for tx, ty in self._target_index[cell_type] if self.is_walkable(tx, ty)]
+        distance, _, owner = self._walkable_bfs(seeds)
+        ownership = (owner, distance)
+        with self._cache_lock:
+            self._ownership_maps[cell_type] = ownership
+        return ownership
+    
+    def _nearest_target(self, cell_type: CellType, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """
+        Get the closest station or zone of a type by walking distance.
+        
+        Reads the ownership map in O(1). A blocked cell (e.g. an obstacle
+        dropped under a robot) uses its best walkable neighbor. If no target
+        is reachable, the closest one by Manhattan distance is returned.
+        
+        Returns:
+            (x, y) of the target, or None if there are none of this type
+        """
+        best = -1
+        if self.is_valid_position(x, y):
+            owner, distance = self.get_ownership_map(cell_type)
+            index = y * self.width + x
+            if self.is_walkable(x, y):
+                best = int(owner[index])
+            else:
+                reachable = [ny * self.width + nx for nx, ny in self.get_neighbors(x, y)
+                             if owner[ny * self.width + nx] >= 0]
+                if reachable:
+                    best = int(owner[min(reachable, key=lambda neighbor: distance[neighbor])])
+        if best >= 0:
+            return (best % self.width, best // self.width)
+        
+        nearest = self._target_index[cell_type].nearest(x, y)
+        return nearest[0] if nearest else None
+    
+    def find_nearest_pickup_zone(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """Find the nearest pickup zone by walking distance"""
+        return self._nearest_target(CellType.PICKUP_ZONE, x, y)
     
     def get_starting_station(self) -> Optional[Tuple[int, int]]:
         """Get the primary starting station (first one in list)"""
@@ -202,30 +925,14 @@ class WarehouseGrid:
     
     def find_nearest_charging_station(self, x: int, y: int) -> Optional[Tuple[int, int]]:
         """
-        Find the nearest charging station using Manhattan distance.
+        Find the nearest charging station by walking distance.
         Returns (x, y) of nearest station or None if no stations exist.
         """
-        if not self.charging_stations:
-            return None
-        
-        def manhattan_distance(pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
-            return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
-        
-        current_pos = (x, y)
-        nearest = min(self.charging_stations, key=lambda station: manhattan_distance(current_pos, station))
-        return nearest
+        return self._nearest_target(CellType.CHARGING_STATION, x, y)
     
     def find_nearest_delivery_zone(self, x: int, y: int) -> Optional[Tuple[int, int]]:
-        """Find the nearest delivery zone using Manhattan distance"""
-        if not self.delivery_zones:
-            return None
-        
-        def manhattan_distance(pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
-            return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
-        
-        current_pos = (x, y)
-        nearest = min(self.delivery_zones, key=lambda zone: manhattan_distance(current_pos, zone))
-        return nearest
+        """Find the nearest delivery zone by walking distance"""
+        return self._nearest_target(CellType.DELIVERY_ZONE, x, y)
     
     def get_random_empty_position(self) -> Tuple[int, int]:
         """Get a random empty position on the grid"""
@@ -280,18 +987,93 @@ class WarehouseGrid:
             return self.set_cell_type(x, y, CellType.STARTING_STATION)
         return False
     
-    def to_dict(self) -> Dict:
-        """Convert grid to dictionary for JSON serialization"""
-        return {
+    def to_dict(self, include_grid: bool = True) -> Dict:
+        """
+        Convert grid to dictionary for JSON serialization.
+        
+        Cell types are sent as the populated tiles: "tiles" lists one entry per
+        allocated tile with its tile coordinates "x" and "y" (cells x * tile_size
+        to (x + 1) * tile_size - 1, likewise for y), its "version" (see
+        tile_version) and "cells", a row-major nested list of indices into
+        "cell_types". Cells outside every listed tile are empty, and tiles on
+        the right and bottom edges may be narrower than tile_size.
+        
+        Args:
+            include_grid: Also send the dense "grid" (rows of cell type values)
+                that clients written before the tiled format read; its size
+                follows the full bounding box (default: True)
+        """
+        payload = {
             "width": self.width,
             "height": self.height,
-            "grid": [[cell.value for cell in row] for row in self.grid],
-            "charging_stations": self.charging_stations,
-            "delivery_zones": self.delivery_zones,
-            "pickup_zones": self.pickup_zones,
-            "starting_stations": self.starting_stations,
-            "obstacles": self.obstacles
+            "tile_size": TILE_SIZE,
+            "cell_types": [cell_type.value for cell_type in CELL_TYPES],
+            "tiles": [
+                {
+                    "x": tile_x,
+                    "y": tile_y,
+                    "version": self.tile_version(tile_x, tile_y),
+                    "cells": self.get_tile(tile_x, tile_y).tolist()
+                }
+                for tile_x, tile_y in self.populated_tiles()
+            ],
+            "charging_stations": self.charging_stations.to_list(),
+            "delivery_zones": self.delivery_zones.to_list(),
+            "pickup_zones": self.pickup_zones.to_list(),
+            "starting_stations": self.starting_stations.to_list(),
+            "obstacles": self.obstacles.to_list()
         }
+        if include_grid:
+            payload["grid"] = _CELL_VALUES[self.cells].tolist()
+        return payload
+    
+    def snapshot(self) -> 'WarehouseGrid':
+        """
+        Get a frozen copy of the grid for planning off the simulation thread.
+        
+        The copy refuses edits and its tiles are read-only, so it can be shared
+        by planner threads or pickled to planner processes. Connected components
+        are labeled up front; the walkability mask, distance fields and
+        ownership maps are left out and rebuilt lazily by whoever plans on the copy.
+        """
+        if self._components_dirty:
+            self._label_components()
+        
+        frozen = WarehouseGrid.__new__(WarehouseGrid)
+        frozen.__dict__.update(self.__dict__)
+        frozen._frozen = True
+        frozen._tiles = {key: tile.copy() for key, tile in self._tiles.items()}
+        for tile in frozen._tiles.values():
+            tile.flags.writeable = False
+        frozen._walkable = None
+        # Labels are replaced, never edited in place, when the live grid relabels
+        frozen._tile_labels = dict(self._tile_labels)
+        frozen._tile_counts = dict(self._tile_counts)
+        frozen._tile_versions = dict(self._tile_versions)
+        frozen.charging_stations = self.charging_stations.copy()
+        frozen.delivery_zones = self.delivery_zones.copy()
+        frozen.pickup_zones = self.pickup_zones.copy()
+        frozen.starting_stations = self.starting_stations.copy()
+        frozen.obstacles = self.obstacles.copy()
+        frozen._change_log = deque(self._change_log, maxlen=self._change_log.maxlen)
+        frozen._target_index = {cell_type: index.copy() for cell_type, index in self._target_index.items()}
+        frozen._distance_fields = OrderedDict()
+        frozen._fields_version = -1
+        frozen._ownership_maps = {}
+        frozen._ownership_version = -1
+        frozen._cache_lock = threading.Lock()
+        return frozen
+    
+    def __getstate__(self) -> Dict:
+        """Pickle everything but the cache lock (snapshots are pickled to planner processes)."""
+        state = self.__dict__.copy()
+        del state["_cache_lock"]
+        return state
+    
+    def __setstate__(self, state: Dict):
+        """Restore a pickled grid with a fresh cache lock."""
+        self.__dict__.update(state)
+        self._cache_lock = threading.Lock()
     
     def get_neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
         """Get walkable neighboring cells (up, down, left, right only - no diagonals)"""
@@ -158,6 +158,10 @@ class JobManager:
         elif delivery is None:
             raise ValueError("No delivery location provided and no environment set")
         
+        # Reject pairs that sit in different connected components of the warehouse
+        if self.environment and not self.environment.are_connected(pickup, delivery):
+            raise ValueError(f"Delivery location {delivery} is not reachable from pickup {pickup}")
+        
         job = Job(pickup, delivery, priority)
         self.pending_jobs.append(job)
         # Sort by priority (higher priority first)
@@ -202,6 +206,19 @@ class JobManager:
             return self.pending_jobs[0]
         return None
     
+    def reject_job(self, job: Job, reason: str = "Unknown"):
+        """
+        Fail a pending job without assigning it to a robot.
+        
+        Args:
+            job: Pending job to reject
+            reason: Reason for rejection
+        """
+        job.fail(reason)
+        if job in self.pending_jobs:
+            self.pending_jobs.remove(job)
+            self.failed_jobs.append(job)
+    
     def assign_job(self, job: Job, robot_id: int):
         """
         Assign a job to a robot.
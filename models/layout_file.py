@@ -0,0 +1,84 @@
+"""
+Layout File
+Compact binary warehouse layouts that are memory-mapped instead of parsed.
+"""
+
+import os
+import struct
+from typing import Union
+
+import numpy as np
+
+from models.environment import TILE_SIZE, WarehouseGrid
+
+
+# Header: magic, format version, tile size, width, height (little-endian)
+LAYOUT_MAGIC = b"AFSGRID\0"
+LAYOUT_VERSION = 1
+_HEADER = struct.Struct("<8sHHII")
+
+
+def save_layout(grid: WarehouseGrid, path: Union[str, os.PathLike]):
+    """
+    Write a grid's cell types to a layout file.
+
+    The file is the header, a uint32 table of non-empty cells per tile and
+    the row-major uint8 cell codes, so it can be mapped straight into memory.
+
+    Args:
+        grid: Grid to save
+        path: File to write (overwritten if it exists)
+    """
+    tiles_x, tiles_y = -(-grid.width // TILE_SIZE), -(-grid.height // TILE_SIZE)
+    tile_counts = np.zeros((tiles_y, tiles_x), dtype='<u4')
+    for tile_x, tile_y in grid.populated_tiles():
+        tile_counts[tile_y, tile_x] = np.count_nonzero(grid.get_tile(tile_x, tile_y))
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(LAYOUT_MAGIC, LAYOUT_VERSION, TILE_SIZE, grid.width, grid.height))
+        f.write(tile_counts.tobytes())
+        f.write(grid.cells.tobytes())
+
+
+def open_layout(path: Union[str, os.PathLike]) -> WarehouseGrid:
+    """
+    Open a layout file as a grid backed by a copy-on-write memory map.
+
+    Processes opening the same file share its pages through the OS page cache;
+    only the populated tiles are read, and edits stay private to the process
+    that makes them.
+
+    Args:
+        path: Layout file written by save_layout
+
+    Returns:
+        Grid over the mapped cells
+    """
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path} is too short to be a layout file")
+        magic, version, tile_size, width, height = _HEADER.unpack(header)
+        if magic != LAYOUT_MAGIC:
+            raise ValueError(f"{path} is not a layout file")
+        if version != LAYOUT_VERSION:
+            raise ValueError(f"Unsupported layout file version {version} in {path}")
+        if tile_size == 0:
+            raise ValueError(f"{path} has a tile size of 0")
+
+        tiles_x, tiles_y = -(-width // tile_size), -(-height // tile_size)
+        table = f.read(4 * tiles_x * tiles_y)
+
+    cells_offset = _HEADER.size + 4 * tiles_x * tiles_y
+    if os.path.getsize(path) < cells_offset + width * height:
+        raise ValueError(f"{path} is truncated")
+
+    cells = np.memmap(path, dtype=np.uint8, mode="c", offset=cells_offset, shape=(height, width))
+
+    # The tile table only applies if the file was written with the current tile size
+    populated = None
+    if tile_size == TILE_SIZE:
+        tile_counts = np.frombuffer(table, dtype='<u4').reshape(tiles_y, tiles_x)
+        populated = [(int(tile_x), int(tile_y)) for tile_y, tile_x in zip(*np.nonzero(tile_counts))]
+
+    return WarehouseGrid.from_cells(cells, populated)
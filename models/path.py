@@ -0,0 +1,144 @@
+"""
+Path Model
+Compact waypoint representation of the path a robot is following.
+"""
+
+from typing import Iterator, Sequence, Tuple
+
+
+Cell = Tuple[int, int]
+
+
+class WaypointPath:
+    """
+    A path stored as its corner points and consumed through a cursor.
+
+    Straight runs of unit steps collapse to their end points, and a wait
+    (the same cell twice in a row) keeps a waypoint of its own. The cells in
+    between are produced on demand, so advancing is O(1) and copies nothing.
+
+    Like the plain list it replaces, a WaypointPath holds the cells still to
+    visit, excluding the robot's current cell: len(), truth value, indexing
+    and iteration all refer to the remaining cells. The waypoints themselves
+    are an immutable tuple that the cursor only reads, so the remaining
+    waypoints of an untouched path are handed out without copying.
+    """
+
+    __slots__ = ("_origin", "_points", "_length", "_segment", "_offset", "_taken")
+
+    def __init__(self, origin: Cell, cells: Sequence[Cell] = ()):
+        """
+        Build a path.
+
+        Args:
+            origin: Cell the path starts from (not part of the path)
+            cells: Cells to visit, each 4-adjacent to or equal to the one before
+        """
+        self._origin = tuple(origin)
+        points = []
+        direction = None
+        previous = self._origin
+        for cell in cells:
+            cell = tuple(cell)
+            step = (cell[0] - previous[0], cell[1] - previous[1])
+            if abs(step[0]) + abs(step[1]) > 1:
+                raise ValueError(f"Path steps from {previous} to non-adjacent cell {cell}")
+            # Extend the current straight run, or start a new segment
+            if step == direction and step != (0, 0):
+                points[-1] = cell
+            else:
+                points.append(cell)
+                direction = step
+            previous = cell
+
+        self._points = tuple(points)
+        self._length = len(cells)
+        # Cursor: segment (index of its end point), steps taken within it, steps taken overall
+        self._segment = 0
+        self._offset = 0
+        self._taken = 0
+
+    def __len__(self) -> int:
+        return self._length - self._taken
+
+    def __bool__(self) -> bool:
+        return self._taken < self._length
+
+    def _segment_ends(self, segment: int) -> Tuple[Cell, Cell]:
+        """First and last point of a segment."""
+        start = self._points[segment - 1] if segment else self._origin
+        return start, self._points[segment]
+
+    def _segment_length(self, segment: int) -> int:
+        """Number of steps in a segment (a wait is one step)."""
+        (ax, ay), (bx, by) = self._segment_ends(segment)
+        return max(1, abs(bx - ax) + abs(by - ay))
+
+    def _cell_at(self, segment: int, offset: int) -> Cell:
+        """Cell reached after offset steps into a segment."""
+        (ax, ay), (bx, by) = self._segment_ends(segment)
+        dx = (bx > ax) - (bx < ax)
+        dy = (by > ay) - (by < ay)
+        if dx == 0 and dy == 0:
+            return bx, by
+        return ax + dx * offset, ay + dy * offset
+
+    def peek(self) -> Cell:
+        """Get the next cell without advancing."""
+        if not self:
+            raise IndexError("peek at the end of the path")
+        return self._cell_at(self._segment, self._offset + 1)
+
+    def advance(self) -> Cell:
+        """Move the cursor one cell forward and return that cell."""
+        if not self:
+            raise IndexError("advance past the end of the path")
+        self._offset += 1
+        cell = self._cell_at(self._segment, self._offset)
+        if self._offset >= self._segment_length(self._segment):
+            self._segment += 1
+            self._offset = 0
+        self._taken += 1
+        return cell
+
+    def __iter__(self) -> Iterator[Cell]:
+        """Iterate over the remaining cells."""
+        offset = self._offset
+        for segment in range(self._segment, len(self._points)):
+            for step in range(offset + 1, self._segment_length(segment) + 1):
+                yield self._cell_at(segment, step)
+            offset = 0
+
+    def __getitem__(self, index):
+        """Get a remaining cell (or list of cells for a slice); O(len) except for 0 and -1."""
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index == 0:
+            return self.peek()
+        if index == -1 and self:
+            return self._points[-1]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("path index out of range")
+        for position, cell in enumerate(self):
+            if position == index:
+                return cell
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (WaypointPath, list, tuple)):
+            return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    def waypoints(self) -> Tuple[Cell, ...]:
+        """
+        Get the remaining corner points; consecutive points are joined by straight runs.
+
+        The result shares the path's storage until the first corner is passed
+        (a full tuple slice is the tuple itself); after that only the few
+        remaining corner points are copied, never the cells between them.
+        """
+        return self._points[self._segment:]
+
+    def __repr__(self) -> str:
+        return f"WaypointPath(remaining={len(self)}, waypoints={self.waypoints()})"
@@ -4,9 +4,11 @@ Defines the Robot class with properties for position, status, and battery.
 """
 
 from enum import Enum
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 import random
 
+from models.path import WaypointPath
+
 
 class RobotStatus(Enum):
     """Enum for robot operational status."""
@@ -22,6 +24,7 @@ class RobotStatus(Enum):
     PICKING_UP = "picking_up"  # At pickup location, loading item
     DROPPING_OFF = "dropping_off"  # At delivery location, unloading item
     RETURNING_TO_START = "returning_to_start"  # Returning to starting station
+    PLANNING = "planning"  # Waiting for the planner pool to return a path
 
 
 class Robot:
@@ -35,7 +38,7 @@ class Robot:
         status (RobotStatus): Current operational status
         battery (int): Battery level (0-100%)
         current_task: Current task assigned to this robot
-        path: Current path the robot is following
+        path (WaypointPath): Remaining path the robot is following
         total_tasks_completed (int): Number of tasks completed
         total_distance_traveled (int): Total distance traveled
         error_count (int): Number of errors encountered
@@ -59,7 +62,8 @@ class Robot:
         self.status = status
         self.battery = battery
         self.current_task = None
-        self.path: List[Tuple[int, int]] = []
+        self.path_index = None  # Fleet PathIndex kept in sync with the remaining path
+        self._path = WaypointPath((x, y))
         self.total_tasks_completed = 0
         self.total_distance_traveled = 0
         self.error_count = 0
@@ -72,6 +76,21 @@ class Robot:
         self.dropoff_complete = False  # Flag for dropoff completion
         self.action_start_time: Optional[float] = None  # Time when pickup/dropoff started
     
+    @property
+    def path(self) -> WaypointPath:
+        """Remaining positions to visit (excluding the current one)."""
+        return self._path
+    
+    @path.setter
+    def path(self, path: Sequence[Tuple[int, int]]):
+        # Planners return cell lists starting next to the robot; store them as waypoints
+        if not isinstance(path, WaypointPath):
+            path = WaypointPath((self.x, self.y), path)
+        if self.path_index is not None:
+            self.path_index.remove_path(self.id, self._path)
+            self.path_index.add_path(self.id, path)
+        self._path = path
+    
     def update_position(self, grid_size: int = 20):
         """
         Update robot position randomly within grid bounds.
@@ -135,11 +154,13 @@ class Robot:
             self.status = RobotStatus.DEAD
             self.last_error = "Battery depleted - robot is dead"
             self.error_count += 1
-            # Cancel current task if any
+            # Cancel current task if any, and any task paused for charging
             if self.current_task:
-                self.interrupted_task = self.current_task
                 self.current_task.cancel()
                 self.current_task = None
+            if self.interrupted_task:
+                self.interrupted_task.cancel()
+                self.interrupted_task = None
             self.path = []
     
     def charge_battery(self, amount: int = 5) -> bool:
@@ -193,6 +214,31 @@ class Robot:
             self.status = RobotStatus.EN_ROUTE  # En route to charging station
             self.last_error = f"Low battery - job paused for charging"
     
+    def interrupt_task_for_charging(self):
+        """
+        Interrupt current task to go charge.
+        Stores the task for later resumption.
+        """
+        if self.current_task and self.status != RobotStatus.DEAD:
+            self.interrupted_task = self.current_task
+            self.current_task = None
+            self.path = []
+            self.status = RobotStatus.EN_ROUTE  # En route to charging station
+            self.last_error = f"Low battery - task paused for charging"
+    
+    def resume_interrupted_task(self) -> bool:
+        """
+        Resume task that was interrupted due to low battery.
+        Only if battery is sufficient now.
+        """
+        if self.interrupted_task and self.battery > 30:
+            self.current_task = self.interrupted_task
+            self.interrupted_task = None
+            self.status = RobotStatus.EN_ROUTE
+            self.last_error = None
+            return True
+        return False
+    
     def resume_interrupted_job(self):
         """
         Resume job that was interrupted due to low battery.
@@ -330,7 +376,7 @@ class Robot:
     def move_along_path(self) -> bool:
         """
         Move robot along its assigned path.
-        Drains battery per move.
+        Drains battery per move; a step onto the current cell is a wait.
         
         Returns:
             True if reached end of path, False otherwise
@@ -342,10 +388,16 @@ class Robot:
         self.previous_position = (self.x, self.y)
         
         # Get next position from path
-        next_pos = self.path[0]
+        next_pos = self.path.advance()
+        if self.path_index is not None:
+            self.path_index.consume(self.id, next_pos)
+        
+        # A repeated cell is a planned wait: no movement, no battery drain
+        if next_pos == (self.x, self.y):
+            return len(self.path) == 0
+        
         self.x, self.y = next_pos
         self.total_distance_traveled += 1
-        self.path.pop(0)
         
         # Drain battery for movement
         self.drain_battery(1)
@@ -397,7 +449,8 @@ class Robot:
             "current_task": self.current_task.to_dict() if self.current_task else None,
             "current_job": self.current_job.to_dict() if self.current_job else None,
             "interrupted_task": self.interrupted_task.to_dict() if self.interrupted_task else None,
-            "path": self.path,
+            "path": self.path.waypoints(),
+            "path_length": len(self.path),
             "tasks_completed": self.total_tasks_completed,
             "distance_traveled": self.total_distance_traveled,
             "error_count": self.error_count,
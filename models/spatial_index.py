@@ -0,0 +1,149 @@
+"""
+Spatial Index
+Bucketed point index for nearest-station and radius queries on the grid.
+"""
+
+from typing import Dict, Iterator, List, Tuple
+
+
+Cell = Tuple[int, int]
+
+
+class BucketIndex:
+    """
+    Grid points hashed into square buckets.
+
+    Nearest queries scan rings of buckets outward from the query cell and stop
+    as soon as no unscanned bucket can hold a closer point, so they only touch
+    the buckets around the query instead of every point. Distances are
+    Manhattan; ties go to the point added first, like min() over a list.
+    """
+
+    def __init__(self, width: int, height: int, bucket_size: int = 8):
+        """
+        Initialize an empty index.
+
+        Args:
+            width: Grid width in cells
+            height: Grid height in cells
+            bucket_size: Width and height of each bucket in cells
+        """
+        if bucket_size < 1:
+            raise ValueError(f"Bucket size must be at least 1, got {bucket_size}")
+
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+        self.buckets_x = -(-width // bucket_size)
+        self.buckets_y = -(-height // bucket_size)
+        # (bucket_x, bucket_y) -> {point: insertion order}
+        self._buckets: Dict[Tuple[int, int], Dict[Cell, int]] = {}
+        self._next_order = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, point: Cell) -> bool:
+        return point in self._buckets.get(self._bucket_of(point[0], point[1]), ())
+
+    def __iter__(self) -> Iterator[Cell]:
+        """Iterate over the points in the order they were added."""
+        entries = [(order, point) for bucket in self._buckets.values() for point, order in bucket.items()]
+        entries.sort()
+        return iter([point for _, point in entries])
+
+    def _bucket_of(self, x: int, y: int) -> Tuple[int, int]:
+        return x // self.bucket_size, y // self.bucket_size
+
+    def add(self, point: Cell):
+        """Add a point (no-op if it is already indexed)."""
+        bucket = self._buckets.setdefault(self._bucket_of(point[0], point[1]), {})
+        if point not in bucket:
+            bucket[point] = self._next_order
+            self._next_order += 1
+            self._count += 1
+
+    def remove(self, point: Cell):
+        """Remove a point (no-op if it is not indexed)."""
+        key = self._bucket_of(point[0], point[1])
+        bucket = self._buckets.get(key)
+        if bucket is not None and point in bucket:
+            del bucket[point]
+            self._count -= 1
+            if not bucket:
+                del self._buckets[key]
+
+    def _ring(self, bucket_x: int, bucket_y: int, ring: int) -> List[Tuple[int, int]]:
+        """Bucket keys at Chebyshev distance ring from a bucket."""
+        if ring == 0:
+            return [(bucket_x, bucket_y)]
+        keys = []
+        for bx in range(bucket_x - ring, bucket_x + ring + 1):
+            keys.append((bx, bucket_y - ring))
+            keys.append((bx, bucket_y + ring))
+        for by in range(bucket_y - ring + 1, bucket_y + ring):
+            keys.append((bucket_x - ring, by))
+            keys.append((bucket_x + ring, by))
+        return keys
+
+    def nearest(self, x: int, y: int, k: int = 1) -> List[Cell]:
+        """
+        Get the k points closest to (x, y).
+
+        Args:
+            x: Query x-coordinate
+            y: Query y-coordinate
+            k: Number of points to return
+
+        Returns:
+            Up to k points, closest first
+        """
+        if k <= 0 or not self._count:
+            return []
+
+        size = self.bucket_size
+        bucket_x, bucket_y = self._bucket_of(x, y)
+        last_ring = max(abs(bucket_x), abs(self.buckets_x - 1 - bucket_x),
+                        abs(bucket_y), abs(self.buckets_y - 1 - bucket_y))
+        found: List[Tuple[int, int, Cell]] = []
+        for ring in range(last_ring + 1):
+            for key in self._ring(bucket_x, bucket_y, ring):
+                for point, order in self._buckets.get(key, {}).items():
+                    found.append((abs(point[0] - x) + abs(point[1] - y), order, point))
+            # Any bucket past this ring is more than ring * size steps away
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= ring * size:
+                    break
+        found.sort()
+        return [point for _, _, point in found[:k]]
+
+    def within(self, x: int, y: int, radius: int) -> List[Cell]:
+        """
+        Get every point within a Manhattan radius of (x, y).
+
+        Returns:
+            Points closest first
+        """
+        size = self.bucket_size
+        first_x, first_y = max(0, (x - radius) // size), max(0, (y - radius) // size)
+        last_x = min(self.buckets_x - 1, (x + radius) // size)
+        last_y = min(self.buckets_y - 1, (y + radius) // size)
+
+        found: List[Tuple[int, int, Cell]] = []
+        for by in range(first_y, last_y + 1):
+            for bx in range(first_x, last_x + 1):
+                for point, order in self._buckets.get((bx, by), {}).items():
+                    distance = abs(point[0] - x) + abs(point[1] - y)
+                    if distance <= radius:
+                        found.append((distance, order, point))
+        found.sort()
+        return [point for _, _, point in found]
+
+    def copy(self) -> 'BucketIndex':
+        """Get an independent copy of the index."""
+        clone = BucketIndex.__new__(BucketIndex)
+        clone.__dict__.update(self.__dict__)
+        clone._buckets = {key: dict(bucket) for key, bucket in self._buckets.items()}
+        return clone
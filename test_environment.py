@@ -0,0 +1,323 @@
+"""
+Test script to verify the WarehouseGrid precomputed structures against brute force.
+Run this to check the grid without starting the API server.
+"""
+
+import os
+import random
+import sys
+import tempfile
+
+import numpy as np
+
+from models.environment import CellType, WarehouseGrid
+from models.layout_file import open_layout, save_layout
+from test_pathfinding import bfs_length, check_path, random_grid, random_open_cell
+from utils.pathfinding import PathFinder
+
+
+def test_distance_fields_match_bfs():
+    """Routes and distances read from the distance fields match BFS."""
+    rng = random.Random(2)
+    for trial in range(40):
+        size = rng.randint(8, 30)
+        grid = random_grid(rng, size, 0.2)
+        stations = [random_open_cell(rng, grid) for _ in range(3)]
+        for x, y in stations:
+            grid.set_cell_type(x, y, CellType.CHARGING_STATION)
+
+        for _ in range(10):
+            start = random_open_cell(rng, grid)
+            for station in stations:
+                label = f"grid {trial} {start}->{station}"
+                expected = bfs_length(grid, start, station)
+                assert grid.distance_to_target(start[0], start[1], station) == expected, label
+                path = grid.path_to_target(start, station)
+                if expected is None:
+                    assert path is None, label
+                else:
+                    check_path(grid, start, station, path, label)
+                    assert len(path) == expected, label
+
+
+def test_components_match_bfs():
+    """are_connected agrees with BFS reachability, for blocked starts and after edits."""
+    rng = random.Random(5)
+    for trial in range(30):
+        size = rng.randint(8, 30)
+        grid = random_grid(rng, size, 0.35)
+        for edit in range(5):
+            for _ in range(20):
+                start = (rng.randrange(size), rng.randrange(size))
+                goal = random_open_cell(rng, grid)
+                reachable = bfs_length(grid, start, goal) is not None
+                assert grid.are_connected(start, goal) == reachable, \
+                    f"grid {trial} edit {edit} {start}->{goal}"
+            x, y = rng.randrange(size), rng.randrange(size)
+            grid.set_cell_type(x, y, CellType.EMPTY if not grid.is_walkable(x, y) else CellType.OBSTACLE)
+
+
+def test_blocked_doorway_connects_both_sides():
+    """A robot under an obstacle dropped into a doorway can still leave through either side."""
+    grid = WarehouseGrid(5, 3, default_features=False)
+    for x in range(5):
+        grid.set_cell_type(x, 1, CellType.OBSTACLE)
+    pathfinder = PathFinder(grid_size=5, warehouse_grid=grid)
+    assert len(pathfinder.find_path((2, 1), (0, 0))) == 3
+    assert len(pathfinder.find_path((2, 1), (0, 2))) == 3
+    assert not grid.are_connected((0, 0), (0, 2))
+
+
+def test_layout_file_round_trip():
+    """A saved layout opens with the same cells, stations and connectivity, and bad headers are rejected."""
+    rng = random.Random(25)
+    grid = WarehouseGrid(150, 90, default_features=False)
+    for _ in range(400):
+        grid.set_cell_type(rng.randrange(150), rng.randrange(90), CellType.OBSTACLE)
+    for cell_type in (CellType.CHARGING_STATION, CellType.PICKUP_ZONE, CellType.DELIVERY_ZONE):
+        grid.set_cell_type(rng.randrange(150), rng.randrange(90), cell_type)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "layout.bin")
+        save_layout(grid, path)
+        loaded = open_layout(path)
+        assert (loaded.width, loaded.height) == (150, 90)
+        assert np.array_equal(loaded.cells, grid.cells)
+        assert sorted(loaded.populated_tiles()) == sorted(grid.populated_tiles())
+        assert set(loaded.charging_stations) == set(grid.charging_stations)
+        assert set(loaded.obstacles) == set(grid.obstacles)
+        for _ in range(50):
+            start, goal = random_open_cell(rng, grid), random_open_cell(rng, grid)
+            assert loaded.are_connected(start, goal) == grid.are_connected(start, goal)
+
+        # Edits stay private to the process: the file still holds the saved layout
+        x, y = random_open_cell(rng, loaded)
+        loaded.set_cell_type(x, y, CellType.OBSTACLE)
+        assert np.array_equal(open_layout(path).cells, grid.cells)
+
+        with open(path, "r+b") as f:
+            f.seek(10)
+            f.write(b"\0\0")
+        try:
+            open_layout(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("a tile size of 0 was accepted")
+
+
+def test_tiles_match_dense_grid():
+    """Serialized tiles rebuild the dense grid, which keeps its pre-tile format."""
+    rng = random.Random(24)
+    grid = WarehouseGrid(150, 100, default_features=False)
+    for _ in range(300):
+        cell_type = rng.choice((CellType.OBSTACLE, CellType.PICKUP_ZONE, CellType.CHARGING_STATION))
+        grid.set_cell_type(rng.randrange(150), rng.randrange(100), cell_type)
+    # A tile emptied again is dropped
+    grid.set_cell_type(140, 90, CellType.OBSTACLE)
+    for x, y in [(x, y) for x, y in grid.obstacles if x >= 128 and y >= 64]:
+        grid.set_cell_type(x, y, CellType.EMPTY)
+
+    payload = grid.to_dict()
+    rebuilt = [[CellType.EMPTY.value] * 150 for _ in range(100)]
+    size = payload["tile_size"]
+    for tile in payload["tiles"]:
+        for row, codes in enumerate(tile["cells"]):
+            for column, code in enumerate(codes):
+                rebuilt[tile["y"] * size + row][tile["x"] * size + column] = payload["cell_types"][code]
+    assert rebuilt == payload["grid"]
+    assert payload["grid"][y][x] == grid.get_cell_type(x, y).value
+    assert "grid" not in grid.to_dict(include_grid=False)
+    for tile_x, tile_y in grid.populated_tiles():
+        assert grid.get_tile(tile_x, tile_y).any()
+
+
+def test_components_across_tiles_match_bfs():
+    """Component labels stitched across tile borders agree with BFS, including after edits."""
+    rng = random.Random(124)
+    size = 160
+    grid = WarehouseGrid(size, size, default_features=False)
+    # Walls along and across the tile borders, with a few gaps
+    for k in (63, 64, 100, 127):
+        for i in range(size):
+            if rng.random() > 0.02:
+                grid.set_cell_type(k, i, CellType.OBSTACLE)
+            if rng.random() > 0.02:
+                grid.set_cell_type(i, k, CellType.OBSTACLE)
+    for edit in range(4):
+        for _ in range(40):
+            start, goal = random_open_cell(rng, grid), random_open_cell(rng, grid)
+            assert grid.are_connected(start, goal) == (bfs_length(grid, start, goal) is not None), \
+                f"edit {edit} {start}->{goal}"
+        walls = list(grid.obstacles)
+        for _ in range(10):
+            x, y = rng.choice(walls)
+            grid.set_cell_type(x, y, CellType.EMPTY)
+        assert np.array_equal(grid.walkable, [[grid.is_walkable(x, y) for x in range(size)]
+                                              for y in range(size)])
+
+
+def test_bucket_index_matches_brute_force():
+    """Nearest and radius queries on the bucket index match a scan of every point, ties to the earliest added."""
+    from models.spatial_index import BucketIndex
+
+    rng = random.Random(21)
+    for trial in range(20):
+        width, height = rng.randrange(5, 60), rng.randrange(5, 60)
+        index = BucketIndex(width, height, bucket_size=rng.choice((1, 3, 8, 16)))
+        points = []
+        for _ in range(300):
+            point = (rng.randrange(width), rng.randrange(height))
+            if rng.random() < 0.3 and points:
+                point = rng.choice(points)
+                index.remove(point)
+                points.remove(point)
+            elif point not in points:
+                index.add(point)
+                points.append(point)
+            assert len(index) == len(points) and list(index) == points
+
+            x, y = rng.randrange(width), rng.randrange(height)
+            ranked = sorted(points, key=lambda p: abs(p[0] - x) + abs(p[1] - y))
+            k = rng.randrange(1, 6)
+            assert index.nearest(x, y, k) == ranked[:k], f"trial {trial}: nearest {k} to {(x, y)}"
+            radius = rng.randrange(0, 20)
+            expected = [p for p in ranked if abs(p[0] - x) + abs(p[1] - y) <= radius]
+            assert index.within(x, y, radius) == expected, f"trial {trial}: within {radius} of {(x, y)}"
+
+
+def test_nearest_targets_follow_layout_edits():
+    """The grid's station index stays in sync with set_cell_type."""
+    rng = random.Random(121)
+    grid = WarehouseGrid(30, 30, default_features=False)
+    for _ in range(400):
+        x, y = rng.randrange(30), rng.randrange(30)
+        grid.set_cell_type(x, y, rng.choice((CellType.EMPTY, CellType.OBSTACLE, CellType.CHARGING_STATION)))
+        qx, qy = rng.randrange(30), rng.randrange(30)
+        stations = [(sx, sy) for sy in range(30) for sx in range(30)
+                    if grid.get_cell_type(sx, sy) == CellType.CHARGING_STATION]
+        distances = sorted(abs(sx - qx) + abs(sy - qy) for sx, sy in stations)
+        nearest = grid.nearest_targets(CellType.CHARGING_STATION, qx, qy, k=3)
+        assert [abs(sx - qx) + abs(sy - qy) for sx, sy in nearest] == distances[:3]
+        assert all(grid.get_cell_type(*cell) == CellType.CHARGING_STATION for cell in nearest)
+        within = grid.targets_within(CellType.CHARGING_STATION, qx, qy, 6)
+        assert sorted(within) == sorted(s for s in stations if abs(s[0] - qx) + abs(s[1] - qy) <= 6)
+
+
+def test_ownership_maps_match_bfs():
+    """Ownership maps give every cell its closest station by walking distance, and follow edits."""
+    from collections import deque
+
+    def bfs_distances(grid, source):
+        distance = {source: 0}
+        queue = deque([source])
+        while queue:
+            cell = queue.popleft()
+            for neighbor in grid.get_neighbors(*cell):
+                if neighbor not in distance:
+                    distance[neighbor] = distance[cell] + 1
+                    queue.append(neighbor)
+        return distance
+
+    rng = random.Random(22)
+    for trial in range(20):
+        size = rng.randint(8, 24)
+        grid = random_grid(rng, size, 0.25)
+        for _ in range(rng.randint(1, 5)):
+            x, y = random_open_cell(rng, grid)
+            grid.set_cell_type(x, y, CellType.CHARGING_STATION)
+
+        for edit in range(3):
+            stations = list(grid.charging_stations)
+            owner, distance = grid.get_ownership_map(CellType.CHARGING_STATION)
+            reference = {station: bfs_distances(grid, station) for station in stations}
+            for y in range(size):
+                for x in range(size):
+                    label = f"grid {trial} edit {edit} {(x, y)}"
+                    if not grid.is_walkable(x, y):
+                        continue
+                    lengths = [reference[s][(x, y)] for s in stations if (x, y) in reference[s]]
+                    index = y * size + x
+                    if not lengths:
+                        assert owner[index] == -1 and distance[index] == -1, label
+                        nearest = grid.find_nearest_charging_station(x, y)
+                        assert nearest in stations and abs(nearest[0] - x) + abs(nearest[1] - y) == \
+                            min(abs(sx - x) + abs(sy - y) for sx, sy in stations), label
+                        continue
+                    assert distance[index] == min(lengths), label
+                    station = (int(owner[index]) % size, int(owner[index]) // size)
+                    assert reference[station].get((x, y)) == min(lengths), label
+                    assert grid.find_nearest_charging_station(x, y) == station, label
+
+            # Move a station and drop an obstacle; the maps must be rebuilt
+            old = rng.choice(stations)
+            grid.set_cell_type(old[0], old[1], CellType.EMPTY)
+            x, y = random_open_cell(rng, grid)
+            grid.set_cell_type(x, y, CellType.CHARGING_STATION)
+            x, y = random_open_cell(rng, grid)
+            if grid.get_cell_type(x, y) == CellType.EMPTY:
+                grid.set_cell_type(x, y, CellType.OBSTACLE)
+
+
+def test_tracked_sets_match_cells():
+    """The per-type position sets match a scan of the cells through edits from the grid and the pathfinder."""
+    tracked = {
+        CellType.OBSTACLE: "obstacles",
+        CellType.CHARGING_STATION: "charging_stations",
+        CellType.DELIVERY_ZONE: "delivery_zones",
+        CellType.PICKUP_ZONE: "pickup_zones",
+        CellType.STARTING_STATION: "starting_stations",
+    }
+    rng = random.Random(23)
+    grid = WarehouseGrid(25, 25)
+    pathfinder = PathFinder(grid_size=25, warehouse_grid=grid)
+    for edit in range(600):
+        x, y = rng.randrange(25), rng.randrange(25)
+        action = rng.random()
+        if action < 0.2:
+            pathfinder.add_obstacle(x, y)
+        elif action < 0.3:
+            pathfinder.remove_obstacle(x, y)
+        else:
+            grid.set_cell_type(x, y, rng.choice(list(CellType)))
+
+        if edit % 50 and edit != 599:
+            continue
+        for cell_type, name in tracked.items():
+            positions = getattr(grid, name)
+            cells = {(cx, cy) for cy in range(25) for cx in range(25) if grid.get_cell_type(cx, cy) == cell_type}
+            assert len(positions) == len(set(positions)), f"{name} lists a position twice"
+            assert set(positions) == cells, f"edit {edit}: {name} out of sync"
+            assert [positions[i] for i in range(len(positions))] == list(positions), f"{name} indexing"
+            assert all(cell in positions for cell in cells)
+        assert pathfinder.obstacles is grid.obstacles
+
+    # Positions stay in insertion order, and a re-added one moves to the end
+    grid = WarehouseGrid(5, 5, default_features=False)
+    for x, y in ((3, 1), (0, 4), (2, 2)):
+        grid.set_cell_type(x, y, CellType.PICKUP_ZONE)
+    grid.set_cell_type(3, 1, CellType.EMPTY)
+    grid.set_cell_type(3, 1, CellType.PICKUP_ZONE)
+    assert grid.pickup_zones == [(0, 4), (2, 2), (3, 1)] and grid.pickup_zones[-1] == (3, 1)
+
+
+if __name__ == "__main__":
+    try:
+        print("="*60)
+        print("🧪 Testing WarehouseGrid structures against brute force")
+        print("="*60)
+        for name, test in list(globals().items()):
+            if name.startswith("test_") and callable(test):
+                test()
+                print(f"\n✓ {test.__doc__}")
+        print("\n" + "="*60)
+        print("✅ All environment tests passed!")
+        print("="*60)
+    except KeyboardInterrupt:
+        print("\n\n⚠ Test interrupted by user")
+        sys.exit(0)
+    except Exception as e:
+        print(f"\n\n❌ Error during testing: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
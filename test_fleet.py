@@ -0,0 +1,114 @@
+"""
+Test script to verify FleetManager behaviour over simulated updates.
+Run this to check the fleet logic without starting the API server.
+"""
+
+import random
+import sys
+
+from fleet.fleet_manager import FleetManager
+from models.environment import CellType
+from models.robot import RobotStatus
+from models.task import TaskStatus
+
+
+def test_low_battery_task_pauses_for_charging():
+    """A robot low on battery pauses its task, charges, then finishes the task."""
+    fleet = FleetManager(num_robots=1)
+    robot = fleet.robots[0]
+    robot.x, robot.y = 3, 3
+    robot.battery = 14
+    task = fleet.assign_task(robot.id, "move", 3, 8)
+    assert task["success"], task
+    visited_charger = False
+    for _ in range(200):
+        fleet.update_fleet()
+        assert not robot.is_dead(), "robot walked its task path until the battery died"
+        visited_charger |= robot.status == RobotStatus.CHARGING
+        if fleet.completed_tasks:
+            break
+    assert visited_charger, "robot never charged"
+    assert [t.task_id for t in fleet.completed_tasks] == [task["task"]["task_id"]]
+    assert not fleet.active_tasks and (robot.x, robot.y) == (3, 8)
+
+
+def test_dead_robot_task_is_failed():
+    """A task whose robot runs out of battery leaves the active list as failed."""
+    fleet = FleetManager(num_robots=1)
+    robot = fleet.robots[0]
+    robot.battery = 16
+    task = fleet.assign_task(robot.id, "move", 10, 18)
+    assert task["success"], task
+    for _ in range(50):
+        fleet.update_fleet()
+        if robot.is_dead():
+            break
+    assert robot.is_dead(), "robot reached a charger; the test needs it to die on the way"
+    assert not fleet.active_tasks
+    assert [t.status for t in fleet.failed_tasks] == [TaskStatus.FAILED]
+    assert robot.interrupted_task is None
+
+
+def test_path_index_matches_remaining_paths():
+    """The path index matches the robots' remaining paths, and blocking a cell drops exactly the paths through it."""
+    random.seed(17)
+    fleet = FleetManager(num_robots=6)
+    grid = fleet.warehouse_grid
+    blocked = 0
+    for tick in range(80):
+        # Keep every robot busy with a move to a random open cell
+        for robot in fleet.robots:
+            if not robot.has_task() and robot.status == RobotStatus.IDLE:
+                x, y = random.randrange(grid.width), random.randrange(grid.height)
+                if grid.get_cell_type(x, y) == CellType.EMPTY:
+                    fleet.assign_task(robot.id, "move", x, y)
+        fleet.update_fleet()
+        crossing = {}
+        for robot in fleet.robots:
+            for cell in robot.path:
+                crossing.setdefault(cell, set()).add(robot.id)
+        for y in range(grid.height):
+            for x in range(grid.width):
+                assert fleet.path_index.robots_at((x, y)) == crossing.get((x, y), set()), \
+                    f"tick {tick}: index disagrees at {(x, y)}"
+
+        if tick % 10 != 5:
+            continue
+        robot_cells = {(robot.x, robot.y) for robot in fleet.robots}
+        candidates = sorted(cell for cell in crossing
+                            if grid.get_cell_type(*cell) == CellType.EMPTY and cell not in robot_cells)
+        if not candidates:
+            continue
+        cell = random.choice(candidates)
+        kept = {robot.id: list(robot.path) for robot in fleet.robots if robot.id not in crossing[cell]}
+        grid.set_cell_type(cell[0], cell[1], CellType.OBSTACLE)
+        assert fleet.invalidate_blocked_paths([cell]) == sorted(crossing[cell])
+        for robot in fleet.robots:
+            if robot.id in crossing[cell]:
+                assert not robot.path, f"tick {tick}: robot {robot.id} kept a blocked path"
+            else:
+                assert list(robot.path) == kept[robot.id], f"tick {tick}: robot {robot.id} lost its path"
+        blocked += 1
+    assert blocked >= 5, "too few paths were blocked"
+
+
+if __name__ == "__main__":
+    try:
+        print("="*60)
+        print("🧪 Testing FleetManager over simulated updates")
+        print("="*60)
+        for name, test in list(globals().items()):
+            if name.startswith("test_") and callable(test):
+                test()
+                print(f"\n✓ {test.__doc__}")
+        print("\n" + "="*60)
+        print("✅ All fleet tests passed!")
+        print("="*60)
+    except KeyboardInterrupt:
+        print("\n\n⚠ Test interrupted by user")
+        sys.exit(0)
+    except Exception as e:
+        print(f"\n\n❌ Error during testing: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
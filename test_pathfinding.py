@@ -0,0 +1,574 @@
+"""
+Test script to verify the pathfinding strategies against breadth-first search.
+Run this to check path lengths without starting the API server.
+"""
+
+import random
+import sys
+from collections import deque
+
+from models.environment import CellType, WarehouseGrid
+from models.path import WaypointPath
+from utils.pathfinding import PathFinder
+from utils.reservation import ReservationTable
+
+
+def random_grid(rng, size, density):
+    """Build a grid with no stations or zones and randomly scattered obstacles."""
+    grid = WarehouseGrid(size, size, default_features=False)
+    for y in range(size):
+        for x in range(size):
+            if rng.random() < density:
+                grid.set_cell_type(x, y, CellType.OBSTACLE)
+    return grid
+
+
+def random_open_cell(rng, grid):
+    """Pick a random walkable cell."""
+    while True:
+        x, y = rng.randrange(grid.width), rng.randrange(grid.height)
+        if grid.is_walkable(x, y):
+            return (x, y)
+
+
+def bfs_length(grid, start, goal):
+    """Reference shortest path length in steps, or None if unreachable."""
+    distance = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        if (x, y) == goal:
+            return distance[goal]
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if (0 <= nx < grid.width and 0 <= ny < grid.height and
+                    (nx, ny) not in distance and grid.is_walkable(nx, ny)):
+                distance[(nx, ny)] = distance[(x, y)] + 1
+                queue.append((nx, ny))
+    return None
+
+
+def check_path(grid, start, goal, path, label):
+    """Assert that a path is a walkable chain of unit steps from start to goal."""
+    previous = start
+    for cell in path:
+        assert abs(cell[0] - previous[0]) + abs(cell[1] - previous[1]) == 1, \
+            f"{label}: {previous} -> {cell} is not a unit step"
+        assert grid.is_walkable(cell[0], cell[1]), f"{label}: {cell} is not walkable"
+        previous = cell
+    assert previous == goal, f"{label}: path ends at {previous}, not {goal}"
+
+
+def check_conflict_free(grid, requests, paths, label):
+    """Assert that paths planned from tick 0 never share a cell or swap cells on the same tick."""
+    # Positions per tick, with robots staying at the end of their paths
+    horizon = max(len(path or []) for path in paths.values()) + 1
+    timelines = {}
+    for agent_id, (start, goal) in requests.items():
+        path = paths[agent_id] or []
+        if paths[agent_id] is not None:
+            check_path(grid, start, goal, [cell for i, cell in enumerate(path)
+                                           if i == 0 or cell != path[i - 1]],
+                       f"{label} agent {agent_id}")
+        cells = [start] + list(path)
+        timelines[agent_id] = cells + [cells[-1]] * (horizon - len(cells))
+
+    for tick in range(horizon):
+        occupied = [timeline[tick] for timeline in timelines.values()]
+        assert len(set(occupied)) == len(occupied), f"{label}: vertex conflict at tick {tick}"
+        if tick:
+            moves = {(timeline[tick - 1], timeline[tick]) for timeline in timelines.values()}
+            for before, after in moves:
+                assert before == after or (after, before) not in moves, \
+                    f"{label}: swap conflict at tick {tick}"
+
+
+def check_strategy(strategy, seed, trials=200, exact=True, **options):
+    """
+    Compare one strategy with BFS on random grids.
+
+    Args:
+        strategy: One of PathFinder.STRATEGIES
+        seed: Random seed for the grids and endpoints
+        trials: Number of random grids
+        exact: Require BFS's length; otherwise only a valid path no shorter than it
+        **options: Extra PathFinder options
+    """
+    rng = random.Random(seed)
+    for trial in range(trials):
+        size = rng.randint(8, 40)
+        grid = random_grid(rng, size, rng.choice((0.1, 0.2, 0.3)))
+        pathfinder = PathFinder(grid_size=size, warehouse_grid=grid, cache_size=0, **options)
+        start, goal = random_open_cell(rng, grid), random_open_cell(rng, grid)
+        expected = bfs_length(grid, start, goal)
+
+        label = f"grid {trial} {strategy} {start}->{goal}"
+        path = pathfinder.find_path(start, goal, strategy=strategy)
+        if expected is None:
+            assert path is None, f"{label}: found a path BFS says does not exist"
+            continue
+        assert path is not None, f"{label}: no path, BFS found {expected} steps"
+        check_path(grid, start, goal, path, label)
+        if exact:
+            assert len(path) == expected, f"{label}: {len(path)} steps, BFS {expected}"
+        else:
+            assert len(path) >= expected, f"{label}: shorter than BFS"
+
+
+def test_astar_matches_bfs():
+    """Flat-index A* finds BFS-length paths, reusing its search state across grids."""
+    check_strategy("astar", seed=7)
+
+
+def test_new_grid_rebuilds_search_state():
+    """Switching grids rebuilds the neighbor table, even for a grid reusing a freed grid's id."""
+    pathfinder = PathFinder(grid_size=10, warehouse_grid=WarehouseGrid(10, 10, default_features=False),
+                            cache_size=0)
+    assert len(pathfinder.find_path((0, 0), (9, 0))) == 9
+    # Free the open grid, so the walled one may be allocated at its address
+    pathfinder.set_warehouse_grid(WarehouseGrid(4, 4, default_features=False))
+
+    walled = WarehouseGrid(10, 10, default_features=False)
+    for y in range(9):
+        walled.set_cell_type(5, y, CellType.OBSTACLE)
+    walled.version = 0
+    pathfinder.set_warehouse_grid(walled)
+    path = pathfinder.find_path((0, 0), (9, 0))
+    check_path(walled, (0, 0), (9, 0), path, "walled grid")
+    assert len(path) == bfs_length(walled, (0, 0), (9, 0))
+
+def test_jps_matches_bfs():
+    """Jump Point Search finds paths of the same length as BFS."""
+    check_strategy("jps", seed=8)
+
+
+def test_hpa_paths_are_valid():
+    """HPA* finds a valid path exactly when BFS does, never shorter than BFS."""
+    check_strategy("hpa", seed=9, exact=False)
+
+
+def test_batch_paths_are_conflict_free():
+    """Paths planned together by CBS never share a cell or swap cells on the same tick."""
+    rng = random.Random(5)
+    for trial in range(10):
+        size = 16
+        grid = random_grid(rng, size, 0.1)
+        pathfinder = PathFinder(grid_size=size, warehouse_grid=grid)
+        requests = {}
+        used = set()
+        while len(requests) < 4:
+            start, goal = random_open_cell(rng, grid), random_open_cell(rng, grid)
+            if start in used or goal in used or start == goal:
+                continue
+            used.update((start, goal))
+            requests[len(requests)] = (start, goal)
+
+        paths = pathfinder.find_paths_batch(requests, ReservationTable(), depart_tick=0,
+                                            time_budget=1.0)
+        check_conflict_free(grid, requests, paths, f"grid {trial}")
+
+
+def test_waypoint_path_matches_cells():
+    """A WaypointPath replays the exact cell list it was built from."""
+    rng = random.Random(3)
+    for trial in range(50):
+        size = rng.randint(8, 24)
+        grid = random_grid(rng, size, 0.2)
+        pathfinder = PathFinder(grid_size=size, warehouse_grid=grid)
+        start, goal = random_open_cell(rng, grid), random_open_cell(rng, grid)
+        cells = pathfinder.find_path(start, goal) or []
+        # Sprinkle in waits, which keep a waypoint of their own
+        for _ in range(rng.randint(0, 3)):
+            if cells:
+                index = rng.randrange(len(cells))
+                cells.insert(index, cells[index])
+
+        path = WaypointPath(start, cells)
+        assert list(path) == cells
+        assert len(path) == len(cells)
+        for index, cell in enumerate(cells):
+            assert path[index] == cell
+        for cell in cells:
+            assert path.peek() == cell
+            assert path.advance() == cell
+        assert not path
+
+
+def test_bidirectional_matches_bfs():
+    """Bidirectional A* finds shortest paths."""
+    check_strategy("bidirectional", seed=12)
+
+
+def test_bulk_search_matches_bfs():
+    """find_paths and cost_matrix agree with BFS for every pair."""
+    rng = random.Random(11)
+    for trial in range(20):
+        size = rng.randint(10, 30)
+        grid = random_grid(rng, size, 0.2)
+        pathfinder = PathFinder(grid_size=size, warehouse_grid=grid)
+        starts = [random_open_cell(rng, grid) for _ in range(4)]
+        goals = [random_open_cell(rng, grid) for _ in range(4)]
+
+        queries = [(start, goal) for start in starts for goal in goals]
+        paths = pathfinder.find_paths(queries)
+        matrix = pathfinder.cost_matrix(starts, goals)
+        for index, (start, goal) in enumerate(queries):
+            expected = bfs_length(grid, start, goal)
+            path = paths[index]
+            if expected is None:
+                assert path is None
+            else:
+                check_path(grid, start, goal, path, f"grid {trial} bulk {start}->{goal}")
+                assert len(path) == expected
+            assert matrix[index // len(goals)][index % len(goals)] == expected
+
+
+def test_bulk_search_rejects_off_grid_starts():
+    """Starts outside the grid have no path, instead of wrapping around the flat arrays."""
+    pathfinder = PathFinder(grid_size=10)
+    starts = [(-1, 0), (10, 3), (3, 10), (2, 2)]
+    paths = pathfinder.find_paths([(start, (5, 5)) for start in starts])
+    assert paths[:3] == [None, None, None]
+    assert len(paths[3]) == 6
+    assert pathfinder.cost_matrix(starts, [(5, 5)]) == [[None], [None], [None], [6]]
+
+
+def test_dstar_lite_repair_matches_bfs():
+    """Incremental D* Lite paths stay shortest while cells are blocked and cleared."""
+    rng = random.Random(23)
+    for trial in range(40):
+        size = rng.randint(10, 30)
+        grid = random_grid(rng, size, 0.15)
+        pathfinder = PathFinder(grid_size=size, warehouse_grid=grid, incremental=True)
+        start, goal = random_open_cell(rng, grid), random_open_cell(rng, grid)
+
+        for step in range(10):
+            label = f"grid {trial} edit {step} {start}->{goal}"
+            expected = bfs_length(grid, start, goal)
+            path = pathfinder.find_path(start, goal, agent_id=1)
+            if expected is None:
+                assert path is None, f"{label}: found a path BFS says does not exist"
+            else:
+                assert path is not None, f"{label}: no path, BFS found {expected} steps"
+                check_path(grid, start, goal, path, label)
+                assert len(path) == expected, f"{label}: {len(path)} steps, BFS {expected}"
+                # Walk part of the way, as a robot would between replans
+                if path:
+                    start = path[min(len(path) - 1, rng.randint(0, 3))]
+
+            # Flip a few cells away from the robot and its goal
+            for _ in range(rng.randint(1, 6)):
+                x, y = rng.randrange(size), rng.randrange(size)
+                if (x, y) in (start, goal):
+                    continue
+                cell_type = CellType.EMPTY if not grid.is_walkable(x, y) else CellType.OBSTACLE
+                grid.set_cell_type(x, y, cell_type)
+
+
+def test_incremental_mode_uses_fields_and_bounded_planners():
+    """Station routes skip D* Lite, and only the most recently used agents keep search state."""
+    grid = WarehouseGrid(20, 20, default_features=False)
+    grid.set_cell_type(19, 19, CellType.CHARGING_STATION)
+    pathfinder = PathFinder(grid_size=20, warehouse_grid=grid, incremental=True)
+
+    path = pathfinder.find_path((0, 0), (19, 19), agent_id=1)
+    assert len(path) == 38
+    assert not pathfinder._agent_planners
+
+    for agent_id in range(PathFinder.MAX_AGENT_PLANNERS + 5):
+        pathfinder.find_path((0, agent_id % 20), (10, 10), agent_id=agent_id)
+    pathfinder.find_path((0, 0), (10, 10), agent_id=0)
+    assert len(pathfinder._agent_planners) == PathFinder.MAX_AGENT_PLANNERS
+    assert list(pathfinder._agent_planners)[-1] == 0
+    assert 1 not in pathfinder._agent_planners
+
+
+def test_path_cache_follows_grid_version_and_weight():
+    """Cached paths are dropped by layout edits and never shared across weights or budgets."""
+    grid = WarehouseGrid(12, 12, default_features=False)
+    pathfinder = PathFinder(grid_size=12, warehouse_grid=grid)
+    assert len(pathfinder.find_path((0, 5), (11, 5))) == 11
+    pathfinder.find_path((0, 5), (11, 5))
+    assert (pathfinder.cache_hits, pathfinder.cache_misses) == (1, 1)
+
+    # A wall across the straight route bumps the version, so the cached path is not reused
+    for y in range(11):
+        grid.set_cell_type(6, y, CellType.OBSTACLE)
+    path = pathfinder.find_path((0, 5), (11, 5))
+    check_path(grid, (0, 5), (11, 5), path, "after edit")
+    assert len(path) == bfs_length(grid, (0, 5), (11, 5))
+    assert pathfinder.cache_misses == 2
+
+    pathfinder.weight = 3.0
+    pathfinder.find_path((0, 5), (11, 5))
+    assert pathfinder.cache_misses == 3
+
+    # Budgeted searches neither read nor fill the cache
+    hits, misses = pathfinder.cache_hits, pathfinder.cache_misses
+    partial = pathfinder.find_path((0, 0), (11, 0), node_budget=3)
+    assert pathfinder.last_path_partial and partial[-1] != (11, 0)
+    pathfinder.find_path((0, 5), (11, 5), node_budget=10000)
+    assert (pathfinder.cache_hits, pathfinder.cache_misses) == (hits, misses)
+    assert len(pathfinder.find_path((0, 0), (11, 0))) == bfs_length(grid, (0, 0), (11, 0))
+
+
+def test_robot_docked_at_goal_keeps_field_route():
+    """A robot parked on the target station does not push the query off the distance field."""
+    grid = WarehouseGrid(20, 20, default_features=False)
+    grid.set_cell_type(19, 0, CellType.CHARGING_STATION)
+    pathfinder = PathFinder(grid_size=20, warehouse_grid=grid)
+    pathfinder.find_path((0, 0), (19, 0))
+
+    path = pathfinder.find_path((0, 0), (19, 0), occupied_positions={(19, 0)})
+    assert len(path) == 19 and pathfinder.last_expansions == 0
+    assert pathfinder.get_next_step((18, 0), (19, 0), {(19, 0)}) == (19, 0)
+
+    # A robot on the route itself still forces a search around it
+    path = pathfinder.find_path((0, 0), (19, 0), occupied_positions={(10, 0)})
+    assert (10, 0) not in path and pathfinder.last_expansions > 0
+
+
+def test_alt_matches_bfs():
+    """A* with farthest-point ALT landmarks stays exact and leaves the station field cache alone."""
+    check_strategy("astar", seed=13, use_landmarks=True)
+
+    rng = random.Random(13)
+    grid = random_grid(rng, 30, 0.2)
+    pathfinder = PathFinder(grid_size=30, warehouse_grid=grid, use_landmarks=True, num_landmarks=4)
+    start, goal = random_open_cell(rng, grid), random_open_cell(rng, grid)
+    pathfinder.find_path(start, goal)
+    assert len(pathfinder._landmark_distances()) == 4
+    assert not grid._distance_fields
+
+
+def test_budgeted_search_makes_progress():
+    """Budget-limited plans return valid partial paths that, followed in turn, reach the goal."""
+    rng = random.Random(14)
+    for trial in range(20):
+        size = rng.randint(15, 30)
+        grid = random_grid(rng, size, 0.25)
+        pathfinder = PathFinder(grid_size=size, warehouse_grid=grid)
+        start, goal = random_open_cell(rng, grid), random_open_cell(rng, grid)
+        expected = bfs_length(grid, start, goal)
+        if not expected:
+            continue
+
+        position, walked = start, 0
+        for _ in range(size * size):
+            path = pathfinder.find_path(position, goal, node_budget=20)
+            assert pathfinder.last_expansions <= 20
+            if pathfinder.last_path_partial:
+                assert path and path[-1] != goal
+            check_path(grid, position, path[-1], path, f"grid {trial} from {position}")
+            # Follow a few steps of the plan, as the fleet does between updates
+            for cell in path[:3]:
+                position, walked = cell, walked + 1
+            if position == goal:
+                break
+        assert position == goal, f"grid {trial}: stuck at {position} after {walked} steps"
+        assert walked >= expected
+
+
+def test_weighted_astar_stays_within_bound():
+    """Weighted A* paths are at most weight times the shortest path."""
+    rng = random.Random(15)
+    for trial in range(50):
+        size = rng.randint(10, 30)
+        grid = random_grid(rng, size, 0.2)
+        pathfinder = PathFinder(grid_size=size, warehouse_grid=grid, weight=2.0)
+        start, goal = random_open_cell(rng, grid), random_open_cell(rng, grid)
+        expected = bfs_length(grid, start, goal)
+        path = pathfinder.find_path(start, goal)
+        if expected is None:
+            assert path is None
+            continue
+        check_path(grid, start, goal, path, f"grid {trial}")
+        assert expected <= len(path) <= 2 * expected
+
+
+def test_planner_pool_matches_sync_planner():
+    """Thread and process pools plan the same costs as a synchronous PathFinder, across layout and congestion updates."""
+    import os
+    import numpy as np
+    from utils.planner_pool import PlannerPool
+
+    def cost(path, extra_costs):
+        return sum(1 + (int(extra_costs[y, x]) if extra_costs is not None else 0) for x, y in path)
+
+    for use_processes in (False, True):
+        rng = random.Random(15)
+        grid = random_grid(rng, 40, 0.2)
+        pool = PlannerPool(grid, workers=4, use_processes=use_processes)
+        try:
+            for round_number in range(3):
+                extra_costs = None
+                if round_number != 1:
+                    extra_costs = np.array([[rng.randrange(4) for _ in range(40)] for _ in range(40)])
+                pool.set_congestion(extra_costs)
+                reference = PathFinder(grid_size=40, warehouse_grid=grid)
+                reference.set_congestion(extra_costs)
+                # More distinct goals than the field LRU holds, planned concurrently on one snapshot
+                queries = [(random_open_cell(rng, grid), random_open_cell(rng, grid)) for _ in range(40)]
+                futures = [pool.submit(start, goal) for start, goal in queries]
+                for (start, goal), future in zip(queries, futures):
+                    path = future.result(timeout=60)
+                    expected = reference.find_path(start, goal)
+                    assert (path is None) == (expected is None), f"pool {start} -> {goal}"
+                    if path is not None:
+                        check_path(grid, start, goal, path, "pool")
+                        assert cost(path, extra_costs) == cost(expected, extra_costs), f"pool {start} -> {goal}"
+                # The next round plans on an edited layout
+                for _ in range(20):
+                    x, y = random_open_cell(rng, grid)
+                    grid.set_cell_type(x, y, CellType.OBSTACLE)
+            if use_processes:
+                # Superseded snapshots and congestion arrays are deleted once their requests finish
+                assert len(os.listdir(pool._directory.name)) <= 2
+        finally:
+            pool.shutdown()
+
+
+def test_cooperative_paths_respect_reservations():
+    """Robots planned one after another around the reservation table never collide."""
+    rng = random.Random(9)
+    for trial in range(20):
+        # Sparse enough that no robot is walled in by others still parked on their starts;
+        # a walled-in robot falls back to its obstacle-only path, which may conflict
+        size = 16
+        grid = random_grid(rng, size, 0.05)
+        pathfinder = PathFinder(grid_size=size, warehouse_grid=grid)
+        reservations = ReservationTable()
+        requests = {}
+        used = set()
+        while len(requests) < 5:
+            start, goal = random_open_cell(rng, grid), random_open_cell(rng, grid)
+            if start in used or goal in used or start == goal or not grid.are_connected(start, goal):
+                continue
+            used.update((start, goal))
+            requests[len(requests)] = (start, goal)
+        # Every robot holds its cell before anyone plans, as the fleet does each update
+        for agent_id, (start, _) in requests.items():
+            pathfinder.hold_position(reservations, agent_id, start, 0)
+
+        paths = {agent_id: pathfinder.find_cooperative_path(start, goal, reservations, agent_id, 0)
+                 for agent_id, (start, goal) in requests.items()}
+        check_conflict_free(grid, requests, paths, f"grid {trial}")
+
+
+def test_flow_steps_follow_shortest_routes():
+    """Flow steps walk shortest routes to a station, sidestepping or waiting around occupied cells."""
+    rng = random.Random(11)
+    for trial in range(20):
+        size = 20
+        grid = random_grid(rng, size, 0.2)
+        goal = random_open_cell(rng, grid)
+        grid.set_cell_type(goal[0], goal[1], CellType.STARTING_STATION)
+        pathfinder = PathFinder(grid_size=size, warehouse_grid=grid)
+        for _ in range(20):
+            start = random_open_cell(rng, grid)
+            expected = bfs_length(grid, start, goal)
+            if expected is None:
+                assert pathfinder.flow_step(start, goal) is None, f"grid {trial}: step off the field"
+                continue
+
+            # Unobstructed, every step goes one cell closer
+            position, steps = start, 0
+            while position != goal:
+                step = pathfinder.flow_step(position, goal)
+                check_path(grid, position, step, [step], f"grid {trial}")
+                position, steps = step, steps + 1
+            assert steps == expected, f"grid {trial}: {start} took {steps} steps, BFS {expected}"
+
+            # Among other robots a step still goes downhill, or waits only when it cannot
+            occupied = {random_open_cell(rng, grid) for _ in range(60)} - {start}
+            step = pathfinder.flow_step(start, goal, occupied)
+            downhill = [cell for cell in grid.get_neighbors(*start)
+                        if bfs_length(grid, cell, goal) == expected - 1]
+            if step == start:
+                assert all(cell in occupied and cell != goal for cell in downhill), \
+                    f"grid {trial}: waited with a free downhill move"
+            else:
+                assert step in downhill and (step not in occupied or step == goal), \
+                    f"grid {trial}: {start} -> {step} is not a free downhill move"
+
+
+def test_congestion_paths_are_cheapest():
+    """With congestion costs, A* returns paths as cheap as Dijkstra's, and decayed traffic turns into costs."""
+    import heapq
+    import numpy as np
+    from utils.congestion import CongestionMap
+
+    def cheapest(grid, extra_costs, start, goal):
+        best = {start: 0}
+        heap = [(0, start)]
+        while heap:
+            cost, (x, y) = heapq.heappop(heap)
+            if (x, y) == goal:
+                return cost
+            if cost > best[(x, y)]:
+                continue
+            for nx, ny in grid.get_neighbors(x, y):
+                step = cost + 1 + int(extra_costs[ny, nx])
+                if step < best.get((nx, ny), step + 1):
+                    best[(nx, ny)] = step
+                    heapq.heappush(heap, (step, (nx, ny)))
+        return None
+
+    rng = random.Random(18)
+    for trial in range(20):
+        size = 24
+        grid = random_grid(rng, size, 0.2)
+        extra_costs = np.array([[rng.randrange(9) for _ in range(size)] for _ in range(size)])
+        pathfinder = PathFinder(grid_size=size, warehouse_grid=grid)
+        pathfinder.set_congestion(extra_costs)
+        for _ in range(20):
+            start, goal = random_open_cell(rng, grid), random_open_cell(rng, grid)
+            path = pathfinder.find_path(start, goal)
+            expected = cheapest(grid, extra_costs, start, goal)
+            if expected is None:
+                assert path is None, f"grid {trial}: path to unreachable {goal}"
+                continue
+            check_path(grid, start, goal, path, f"grid {trial}")
+            cost = sum(1 + int(extra_costs[y, x]) for x, y in path)
+            assert cost == expected, f"grid {trial}: {start} -> {goal} costs {cost}, Dijkstra {expected}"
+
+    # A robot held on a cell every update settles at 1 / (1 - decay) visits, capped by max_penalty
+    congestion = CongestionMap(8, 8, decay=0.5, penalty=1.5, max_penalty=8)
+    for _ in range(60):
+        congestion.record([(2, 3), (2, 3)])
+    costs = congestion.extra_costs()
+    assert costs[3, 2] == 6 and costs.sum() == 6
+    congestion.record([])
+    assert congestion.extra_costs()[3, 2] == 3
+
+    # Traffic on the shorter of two routes sends the next robot around it
+    grid = WarehouseGrid(9, 3, default_features=False)
+    for x in range(1, 8):
+        grid.set_cell_type(x, 1, CellType.OBSTACLE)
+    pathfinder = PathFinder(grid_size=9, warehouse_grid=grid)
+    congestion = CongestionMap(9, 3, penalty=1.0)
+    for _ in range(20):
+        congestion.record([(4, 0)])
+    pathfinder.set_congestion(congestion.extra_costs())
+    assert (4, 2) in pathfinder.find_path((0, 0), (8, 0))
+
+
+if __name__ == "__main__":
+    try:
+        print("="*60)
+        print("🧪 Testing pathfinding strategies against BFS")
+        print("="*60)
+        for name, test in list(globals().items()):
+            if name.startswith("test_") and callable(test):
+                test()
+                print(f"\n✓ {test.__doc__}")
+        print("\n" + "="*60)
+        print("✅ All pathfinding tests passed!")
+        print("="*60)
+    except KeyboardInterrupt:
+        print("\n\n⚠ Test interrupted by user")
+        sys.exit(0)
+    except Exception as e:
+        print(f"\n\n❌ Error during testing: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
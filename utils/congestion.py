@@ -0,0 +1,65 @@
+"""
+Congestion Map
+Tracks recent robot traffic per cell and turns it into extra traversal costs.
+"""
+
+from typing import Iterable, Tuple
+
+import numpy as np
+
+
+class CongestionMap:
+    """
+    Exponentially decayed robot visit counts over the warehouse floor.
+
+    Every update the counts decay by a constant factor and each robot adds one
+    visit to the cell it stands on, so a cell held by a robot every tick
+    settles at 1 / (1 - decay) visits. The extra cost of entering a cell is
+    penalty times its count, rounded and capped at max_penalty, which keeps
+    the costs integral for the planner's integer score arrays.
+    """
+
+    def __init__(self, width: int, height: int, decay: float = 0.9,
+                 penalty: float = 1.0, max_penalty: int = 8):
+        """
+        Initialize an empty congestion map.
+
+        Args:
+            width: Grid width in cells
+            height: Grid height in cells
+            decay: Fraction of the counts kept per update, in [0, 1)
+            penalty: Extra cost per decayed visit
+            max_penalty: Largest extra cost of a single cell
+        """
+        if not 0 <= decay < 1:
+            raise ValueError(f"Congestion decay must be in [0, 1), got {decay}")
+        if penalty < 0:
+            raise ValueError(f"Congestion penalty must be non-negative, got {penalty}")
+
+        self.width = width
+        self.height = height
+        self.decay = decay
+        self.penalty = penalty
+        self.max_penalty = max_penalty
+        self.visits = np.zeros((height, width), dtype=np.float64)
+
+    def record(self, positions: Iterable[Tuple[int, int]]):
+        """
+        Decay the counts and add one visit per robot position.
+
+        Args:
+            positions: (x, y) cells occupied this update
+        """
+        self.visits *= self.decay
+        for x, y in positions:
+            if 0 <= x < self.width and 0 <= y < self.height:
+                self.visits[y, x] += 1
+
+    def extra_costs(self) -> np.ndarray:
+        """Get the integer extra cost of entering each cell, indexed [y, x]."""
+        costs = np.rint(self.visits * self.penalty)
+        return np.minimum(costs, self.max_penalty).astype(np.int32)
+
+    def clear(self):
+        """Forget all recorded traffic."""
+        self.visits.fill(0)
@@ -0,0 +1,173 @@
+"""
+Incremental Pathfinding
+Implements D* Lite for robots that keep replanning toward the same goal
+while the warehouse layout changes around them.
+"""
+
+import heapq
+from typing import Dict, List, Tuple, Optional, Iterable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from models.environment import WarehouseGrid
+
+
+INFINITY = float("inf")
+
+
+class DStarLite:
+    """
+    D* Lite search state for a single robot and goal.
+
+    The search runs backward from the goal, so the robot's start cell can move
+    freely between plans. When cells change walkability only the affected
+    vertices are repaired instead of searching the whole grid again.
+
+    Moving into a cell costs 1 if the cell is walkable and infinity otherwise,
+    so a robot standing on a freshly placed obstacle can still step off it.
+    """
+
+    def __init__(self, warehouse_grid: 'WarehouseGrid', goal: Tuple[int, int]):
+        """
+        Initialize the search state.
+
+        Args:
+            warehouse_grid: WarehouseGrid to plan on
+            goal: Goal position (x, y)
+        """
+        self.warehouse_grid = warehouse_grid
+        self.goal = goal
+        self.version = warehouse_grid.version
+        self.width = warehouse_grid.width
+        self.height = warehouse_grid.height
+
+        self._goal_index = goal[1] * self.width + goal[0]
+        self._g: Dict[int, float] = {}
+        self._rhs: Dict[int, float] = {self._goal_index: 0}
+        self._open: List[Tuple[Tuple[float, float], int]] = []
+        self._open_keys: Dict[int, Tuple[float, float]] = {}
+        self._km = 0
+        self._last_start: Optional[int] = None
+        self.expansions = 0
+
+        self._push(self._goal_index, (self._manhattan(self._goal_index, self._goal_index), 0))
+
+    def _manhattan(self, a: int, b: int) -> int:
+        """Manhattan distance between two flat indices."""
+        ay, ax = divmod(a, self.width)
+        by, bx = divmod(b, self.width)
+        return abs(ax - bx) + abs(ay - by)
+
+    def _neighbors(self, index: int) -> Iterable[int]:
+        """In-bounds 4-connected neighbors of a flat index."""
+        y, x = divmod(index, self.width)
+        if y > 0:
+            yield index - self.width
+        if y < self.height - 1:
+            yield index + self.width
+        if x > 0:
+            yield index - 1
+        if x < self.width - 1:
+            yield index + 1
+
+    def _cost(self, index: int) -> float:
+        """Cost of moving into a cell."""
+        y, x = divmod(index, self.width)
+        return 1 if self.warehouse_grid.walkable[y, x] else INFINITY
+
+    def _calculate_key(self, index: int, start: int) -> Tuple[float, float]:
+        best = min(self._g.get(index, INFINITY), self._rhs.get(index, INFINITY))
+        return (best + self._manhattan(start, index) + self._km, best)
+
+    def _push(self, index: int, key: Tuple[float, float]):
+        self._open_keys[index] = key
+        heapq.heappush(self._open, (key, index))
+
+    def _top_key(self) -> Tuple[float, float]:
+        """Smallest valid key in the open list (stale heap entries are dropped)."""
+        while self._open:
+            key, index = self._open[0]
+            if self._open_keys.get(index) == key:
+                return key
+            heapq.heappop(self._open)
+        return (INFINITY, INFINITY)
+
+    def _update_vertex(self, index: int, start: int):
+        if index != self._goal_index:
+            self._rhs[index] = min(
+                (self._cost(succ) + self._g.get(succ, INFINITY) for succ in self._neighbors(index)),
+                default=INFINITY
+            )
+        self._open_keys.pop(index, None)
+        if self._g.get(index, INFINITY) != self._rhs.get(index, INFINITY):
+            self._push(index, self._calculate_key(index, start))
+
+    def _compute_shortest_path(self, start: int):
+        while (self._top_key() < self._calculate_key(start, start) or
+               self._rhs.get(start, INFINITY) != self._g.get(start, INFINITY)):
+            old_key, current = heapq.heappop(self._open)
+            del self._open_keys[current]
+            self.expansions += 1
+
+            new_key = self._calculate_key(current, start)
+            g_value = self._g.get(current, INFINITY)
+            rhs_value = self._rhs.get(current, INFINITY)
+
+            if old_key < new_key:
+                # Key went stale after km grew; requeue with the fresh key
+                self._push(current, new_key)
+            elif g_value > rhs_value:
+                self._g[current] = rhs_value
+                for pred in self._neighbors(current):
+                    self._update_vertex(pred, start)
+            else:
+                self._g[current] = INFINITY
+                self._update_vertex(current, start)
+                for pred in self._neighbors(current):
+                    self._update_vertex(pred, start)
+
+    def apply_changes(self, cells: List[Tuple[int, int]]):
+        """
+        Repair the search after cells changed walkability.
+
+        Args:
+            cells: (x, y) positions whose walkability flipped
+        """
+        start = self._last_start if self._last_start is not None else self._goal_index
+        for x, y in cells:
+            changed = y * self.width + x
+            # Only edges into the changed cell have a new cost
+            for pred in self._neighbors(changed):
+                self._update_vertex(pred, start)
+        self.version = self.warehouse_grid.version
+
+    def plan(self, start: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Plan (or repair) the path from start to the goal.
+
+        Args:
+            start: Current robot position (x, y)
+
+        Returns:
+            List of positions excluding start, or None if the goal is unreachable
+        """
+        start_index = start[1] * self.width + start[0]
+        if self._last_start is not None:
+            self._km += self._manhattan(self._last_start, start_index)
+        self._last_start = start_index
+
+        self._compute_shortest_path(start_index)
+        if self._g.get(start_index, INFINITY) == INFINITY:
+            return None
+
+        # Walk downhill on g from start to goal
+        path = []
+        current = start_index
+        while current != self._goal_index:
+            current = min(
+                self._neighbors(current),
+                key=lambda succ: self._cost(succ) + self._g.get(succ, INFINITY)
+            )
+            if self._g.get(current, INFINITY) == INFINITY or len(path) > self.width * self.height:
+                return None
+            path.append((current % self.width, current // self.width))
+        return path
@@ -0,0 +1,304 @@
+"""
+Hierarchical Pathfinding
+Implements HPA* (Hierarchical Path-Finding A*) for large warehouse grids.
+"""
+
+import heapq
+from collections import deque
+from typing import Dict, List, Set, Tuple, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from models.environment import WarehouseGrid
+
+
+# Border runs at least this long get a transition at each end instead of one in the middle
+LONG_ENTRANCE = 6
+
+
+class HierarchicalPlanner:
+    """
+    HPA* planner over a WarehouseGrid split into square clusters.
+
+    Each shared border between two clusters is scanned for runs of cells that
+    are walkable on both sides (entrances). Every entrance contributes one or
+    two transitions, whose endpoint cells form the abstract graph together
+    with intra-cluster distances between them. A query searches the abstract
+    graph and then refines only the abstract edges it uses into cell paths.
+
+    Paths are near-optimal rather than guaranteed shortest. Layout edits are
+    picked up from the grid's change log and only rebuild the clusters that
+    contain a changed cell (plus a neighbor if the cell lies on their border).
+    """
+
+    def __init__(self, warehouse_grid: 'WarehouseGrid', cluster_size: int = 16):
+        """
+        Initialize the planner and build the abstract graph.
+
+        Args:
+            warehouse_grid: WarehouseGrid to plan on
+            cluster_size: Width and height of each cluster in cells
+        """
+        self.warehouse_grid = warehouse_grid
+        self.cluster_size = cluster_size
+        self.width = warehouse_grid.width
+        self.height = warehouse_grid.height
+        self.clusters_x = -(-self.width // cluster_size)
+        self.clusters_y = -(-self.height // cluster_size)
+        self.expansions = 0
+
+        # Border (cluster_a, cluster_b) -> transitions as (cell_in_a, cell_in_b) flat indices
+        self._borders: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        # Abstract node -> partner nodes across a border
+        self._transitions: Dict[int, Set[int]] = {}
+        # Cluster -> {node: {other_node: distance}} within the cluster
+        self._intra: Dict[int, Dict[int, Dict[int, int]]] = {}
+
+        self.rebuild()
+
+    def rebuild(self):
+        """Rebuild the whole abstract graph from the current layout."""
+        self._borders.clear()
+        self._transitions.clear()
+        self._intra.clear()
+        for cluster in range(self.clusters_x * self.clusters_y):
+            cx, cy = cluster % self.clusters_x, cluster // self.clusters_x
+            if cx + 1 < self.clusters_x:
+                self._build_border(cluster, cluster + 1)
+            if cy + 1 < self.clusters_y:
+                self._build_border(cluster, cluster + self.clusters_x)
+        for cluster in range(self.clusters_x * self.clusters_y):
+            self._build_intra(cluster)
+        self.version = self.warehouse_grid.version
+
+    def sync(self):
+        """Apply layout edits made since the last build, cluster by cluster."""
+        if self.version == self.warehouse_grid.version:
+            return
+        changes = self.warehouse_grid.changes_since(self.version)
+        if changes is None:
+            self.rebuild()
+            return
+
+        dirty: Set[int] = set()
+        for x, y in changes:
+            cluster = self.cluster_of(x, y)
+            dirty.add(cluster)
+            for neighbor in self._border_neighbors(x, y):
+                key = (min(cluster, neighbor), max(cluster, neighbor))
+                self._build_border(*key)
+                dirty.add(neighbor)
+        for cluster in dirty:
+            self._build_intra(cluster)
+        self.version = self.warehouse_grid.version
+
+    def cluster_of(self, x: int, y: int) -> int:
+        """Get the cluster id containing a cell."""
+        return (y // self.cluster_size) * self.clusters_x + x // self.cluster_size
+
+    def _cluster_bounds(self, cluster: int) -> Tuple[int, int, int, int]:
+        """Get (x0, y0, x1, y1) of a cluster, with x1/y1 exclusive."""
+        x0 = (cluster % self.clusters_x) * self.cluster_size
+        y0 = (cluster // self.clusters_x) * self.cluster_size
+        return x0, y0, min(x0 + self.cluster_size, self.width), min(y0 + self.cluster_size, self.height)
+
+    def _border_neighbors(self, x: int, y: int) -> List[int]:
+        """Clusters that share a border edge with the cell at (x, y)."""
+        size = self.cluster_size
+        neighbors = []
+        if x % size == 0 and x > 0:
+            neighbors.append(self.cluster_of(x - 1, y))
+        if x % size == size - 1 and x + 1 < self.width:
+            neighbors.append(self.cluster_of(x + 1, y))
+        if y % size == 0 and y > 0:
+            neighbors.append(self.cluster_of(x, y - 1))
+        if y % size == size - 1 and y + 1 < self.height:
+            neighbors.append(self.cluster_of(x, y + 1))
+        return neighbors
+
+    def _build_border(self, first: int, second: int):
+        """Recompute the transitions across the border between two adjacent clusters."""
+        for a, b in self._borders.pop((first, second), []):
+            self._transitions.get(a, set()).discard(b)
+            self._transitions.get(b, set()).discard(a)
+
+        walkable = self.warehouse_grid.walkable
+        fx0, fy0, fx1, fy1 = self._cluster_bounds(first)
+        if second == first + 1 and (first % self.clusters_x) + 1 < self.clusters_x:
+            # Vertical border: first is on the left
+            pairs = [((fx1 - 1, y), (fx1, y)) for y in range(fy0, fy1)]
+        else:
+            # Horizontal border: first is on top
+            pairs = [((x, fy1 - 1), (x, fy1)) for x in range(fx0, fx1)]
+
+        transitions = []
+        run: List[Tuple[Tuple[int, int], Tuple[int, int]]] = []
+        for pair in pairs + [None]:
+            if pair is not None and walkable[pair[0][1], pair[0][0]] and walkable[pair[1][1], pair[1][0]]:
+                run.append(pair)
+                continue
+            if run:
+                chosen = [run[0], run[-1]] if len(run) >= LONG_ENTRANCE else [run[len(run) // 2]]
+                for (ax, ay), (bx, by) in chosen:
+                    a, b = ay * self.width + ax, by * self.width + bx
+                    transitions.append((a, b))
+                    self._transitions.setdefault(a, set()).add(b)
+                    self._transitions.setdefault(b, set()).add(a)
+                run = []
+        self._borders[(first, second)] = transitions
+
+    def _cluster_nodes(self, cluster: int) -> Set[int]:
+        """Abstract nodes that lie inside a cluster."""
+        cx, cy = cluster % self.clusters_x, cluster // self.clusters_x
+        nodes = set()
+        if cx > 0:
+            nodes.update(b for _, b in self._borders.get((cluster - 1, cluster), []))
+        if cx + 1 < self.clusters_x:
+            nodes.update(a for a, _ in self._borders.get((cluster, cluster + 1), []))
+        if cy > 0:
+            nodes.update(b for _, b in self._borders.get((cluster - self.clusters_x, cluster), []))
+        if cy + 1 < self.clusters_y:
+            nodes.update(a for a, _ in self._borders.get((cluster, cluster + self.clusters_x), []))
+        return nodes
+
+    def _build_intra(self, cluster: int):
+        """Recompute distances between the abstract nodes inside a cluster."""
+        nodes = self._cluster_nodes(cluster)
+        edges: Dict[int, Dict[int, int]] = {}
+        for node in nodes:
+            distances = self._cluster_bfs(node, cluster)
+            edges[node] = {other: distances[other] for other in nodes
+                           if other != node and other in distances}
+        self._intra[cluster] = edges
+
+    def _cluster_bfs(self, source: int, cluster: int) -> Dict[int, int]:
+        """Distances from source to every reachable cell within a cluster."""
+        return self._cluster_search(source, cluster)[0]
+
+    def _cluster_search(self, source: int, cluster: int,
+                        target: Optional[int] = None) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """
+        Breadth-first search confined to one cluster.
+
+        Returns:
+            (distance, parent) maps keyed by flat index
+        """
+        x0, y0, x1, y1 = self._cluster_bounds(cluster)
+        walkable = self.warehouse_grid.walkable
+        width = self.width
+        distance = {source: 0}
+        parent = {source: -1}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current == target:
+                break
+            cy, cx = divmod(current, width)
+            for nx, ny in ((cx, cy - 1), (cx, cy + 1), (cx - 1, cy), (cx + 1, cy)):
+                if x0 <= nx < x1 and y0 <= ny < y1 and walkable[ny, nx]:
+                    neighbor = ny * width + nx
+                    if neighbor not in distance:
+                        distance[neighbor] = distance[current] + 1
+                        parent[neighbor] = current
+                        queue.append(neighbor)
+        return distance, parent
+
+    def _refine(self, source: int, target: int) -> Optional[List[int]]:
+        """Expand one abstract edge into cells (excluding source)."""
+        if target in self._transitions.get(source, ()):
+            return [target]
+        sx, sy = source % self.width, source // self.width
+        distance, parent = self._cluster_search(source, self.cluster_of(sx, sy), target)
+        if target not in distance:
+            return None
+        cells = []
+        current = target
+        while current != source:
+            cells.append(current)
+            current = parent[current]
+        cells.reverse()
+        return cells
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Find a near-optimal path from start to goal.
+
+        Args:
+            start: Starting position (x, y)
+            goal: Goal position (x, y)
+
+        Returns:
+            List of positions excluding start, or None if no path exists
+        """
+        self.sync()
+        self.expansions = 0
+        if start == goal:
+            return []
+
+        width = self.width
+        start_index = start[1] * width + start[0]
+        goal_index = goal[1] * width + goal[0]
+        start_cluster = self.cluster_of(*start)
+        goal_cluster = self.cluster_of(*goal)
+
+        # Temporary edges from start into its cluster and from goal's cluster into goal
+        start_distances = self._cluster_bfs(start_index, start_cluster)
+        start_nodes = self._cluster_nodes(start_cluster)
+        start_edges = {node: start_distances[node] for node in start_nodes if node in start_distances}
+        if start_cluster == goal_cluster and goal_index in start_distances:
+            start_edges[goal_index] = start_distances[goal_index]
+
+        goal_distances = self._cluster_bfs(goal_index, goal_cluster)
+        goal_edges = {node: goal_distances[node] for node in self._cluster_nodes(goal_cluster)
+                      if node in goal_distances}
+
+        def heuristic(index: int) -> int:
+            return abs(index % width - goal[0]) + abs(index // width - goal[1])
+
+        # A* over the abstract graph
+        g_score = {start_index: 0}
+        came_from: Dict[int, int] = {}
+        counter = 0
+        open_set = [(heuristic(start_index), counter, start_index)]
+        closed: Set[int] = set()
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            if current == goal_index:
+                break
+            if current in closed:
+                continue
+            closed.add(current)
+            self.expansions += 1
+
+            if current == start_index:
+                edges = dict(start_edges)
+            else:
+                cx, cy = current % width, current // width
+                edges = dict(self._intra.get(self.cluster_of(cx, cy), {}).get(current, {}))
+            for partner in self._transitions.get(current, ()):
+                edges[partner] = 1
+            if current in goal_edges:
+                edges[goal_index] = goal_edges[current]
+
+            for neighbor, cost in edges.items():
+                tentative = g_score[current] + cost
+                if neighbor not in g_score or tentative < g_score[neighbor]:
+                    g_score[neighbor] = tentative
+                    came_from[neighbor] = current
+                    counter += 1
+                    heapq.heappush(open_set, (tentative + heuristic(neighbor), counter, neighbor))
+        else:
+            return None
+
+        # Refine the abstract route segment by segment
+        abstract = [goal_index]
+        while abstract[-1] != start_index:
+            abstract.append(came_from[abstract[-1]])
+        abstract.reverse()
+
+        path: List[Tuple[int, int]] = []
+        for source, target in zip(abstract, abstract[1:]):
+            cells = self._refine(source, target)
+            if cells is None:
+                return None
+            path.extend((cell % width, cell // width) for cell in cells)
+        return path
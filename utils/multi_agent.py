@@ -0,0 +1,198 @@
+"""
+Multi-Agent Pathfinding
+Implements Conflict-Based Search (CBS) for planning several robots at once.
+"""
+
+import heapq
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from utils.reservation import ReservationTable
+
+
+Cell = Tuple[int, int]
+
+
+class ConstrainedReservations:
+    """
+    Read-only view of a reservation table plus one agent's CBS constraints.
+
+    Answers the same queries as ReservationTable, so PathFinder's space-time
+    search serves as the CBS low level unchanged.
+    """
+
+    def __init__(self, base: ReservationTable, vertex: Set[Tuple[Cell, int]],
+                 edge: Set[Tuple[Cell, Cell, int]]):
+        """
+        Initialize the view.
+
+        Args:
+            base: Reservations held by robots outside the batch
+            vertex: Forbidden (cell, tick) pairs
+            edge: Forbidden (from_cell, to_cell, arrival_tick) moves
+        """
+        self.base = base
+        self.vertex = vertex
+        self.edge = edge
+        # Latest tick a goal cell is forbidden, so goal checks stay O(1) per cell
+        self._last_tick: Dict[Cell, int] = {}
+        for cell, tick in vertex:
+            if tick > self._last_tick.get(cell, -1):
+                self._last_tick[cell] = tick
+
+    def is_reserved(self, cell: Cell, tick: int, agent_id: int) -> bool:
+        return (cell, tick) in self.vertex or self.base.is_reserved(cell, tick, agent_id)
+
+    def is_swap(self, from_cell: Cell, to_cell: Cell, tick: int, agent_id: int) -> bool:
+        return (from_cell, to_cell, tick) in self.edge or self.base.is_swap(from_cell, to_cell, tick, agent_id)
+
+    def is_free_from(self, cell: Cell, tick: int, agent_id: int) -> bool:
+        if self._last_tick.get(cell, -1) >= tick:
+            return False
+        return self.base.is_free_from(cell, tick, agent_id)
+
+
+class ConflictBasedSearch:
+    """
+    Conflict-Based Search over space-time paths.
+
+    The high level keeps a constraint tree ordered by the total path length.
+    Each node plans every agent independently (respecting its constraints and
+    the shared reservation table), finds the earliest vertex or swap conflict
+    between two agents and branches by forbidding it for one agent or the other.
+
+    Robots stay on their final cell after arriving, except on shared cells
+    (stations and zones), where several robots may dock at once and no
+    conflicts are reported.
+    """
+
+    def __init__(self, search: Callable, is_shared: Callable[[Cell], bool],
+                 max_nodes: int = 256):
+        """
+        Initialize the solver.
+
+        Args:
+            search: Single-agent space-time search, called as
+                search(start, goal, reservations, agent_id, depart_tick)
+            is_shared: Predicate for cells several robots may occupy at once
+            max_nodes: Maximum constraint tree nodes to expand
+        """
+        self.search = search
+        self.is_shared = is_shared
+        self.max_nodes = max_nodes
+        self.expanded_nodes = 0
+
+    def solve(self, agents: Dict[int, Tuple[Cell, Cell]], reservations: ReservationTable,
+              depart_tick: int, time_budget: float) -> Optional[Dict[int, List[Cell]]]:
+        """
+        Find conflict-free paths for all agents.
+
+        Args:
+            agents: agent_id -> (start, goal)
+            reservations: Reservations of robots outside the batch (read only)
+            depart_tick: Tick at which every agent is still at its start
+            time_budget: Seconds allowed before giving up
+
+        Returns:
+            agent_id -> path (cells reached at depart_tick + 1, ...), or None
+            if no solution was found within the budget
+        """
+        deadline = time.perf_counter() + time_budget
+        self.expanded_nodes = 0
+
+        # A node is (vertex constraints, edge constraints, paths), each keyed by agent
+        vertex: Dict[int, Set[Tuple[Cell, int]]] = {agent: set() for agent in agents}
+        edge: Dict[int, Set[Tuple[Cell, Cell, int]]] = {agent: set() for agent in agents}
+        paths: Dict[int, List[Cell]] = {}
+        for agent in agents:
+            path = self._plan(agent, agents[agent], reservations, vertex[agent], edge[agent], depart_tick)
+            if path is None:
+                return None
+            paths[agent] = path
+
+        counter = 0
+        open_nodes = [(self._cost(paths), counter, vertex, edge, paths)]
+        while open_nodes:
+            if self.expanded_nodes >= self.max_nodes or time.perf_counter() > deadline:
+                return None
+            _, _, vertex, edge, paths = heapq.heappop(open_nodes)
+            self.expanded_nodes += 1
+
+            conflict = self._first_conflict(agents, paths, depart_tick)
+            if conflict is None:
+                return paths
+
+            for agent, constraint in conflict:
+                child_vertex = dict(vertex)
+                child_edge = dict(edge)
+                if len(constraint) == 2:
+                    child_vertex[agent] = vertex[agent] | {constraint}
+                else:
+                    child_edge[agent] = edge[agent] | {constraint}
+                path = self._plan(agent, agents[agent], reservations,
+                                  child_vertex[agent], child_edge[agent], depart_tick)
+                if path is None:
+                    continue
+                child_paths = dict(paths)
+                child_paths[agent] = path
+                counter += 1
+                heapq.heappush(open_nodes, (self._cost(child_paths), counter,
+                                            child_vertex, child_edge, child_paths))
+        return None
+
+    def _plan(self, agent: int, endpoints: Tuple[Cell, Cell], reservations: ReservationTable,
+              vertex: Set[Tuple[Cell, int]], edge: Set[Tuple[Cell, Cell, int]],
+              depart_tick: int) -> Optional[List[Cell]]:
+        """Low-level search for one agent under its constraints."""
+        start, goal = endpoints
+        if start == goal:
+            return []
+        view = ConstrainedReservations(reservations, vertex, edge)
+        return self.search(start, goal, view, agent, depart_tick)
+
+    @staticmethod
+    def _cost(paths: Dict[int, List[Cell]]) -> int:
+        return sum(len(path) for path in paths.values())
+
+    def _first_conflict(self, agents: Dict[int, Tuple[Cell, Cell]], paths: Dict[int, List[Cell]],
+                        depart_tick: int) -> Optional[List[Tuple[int, Tuple]]]:
+        """
+        Find the earliest conflict between two agents.
+
+        Returns:
+            Two (agent, constraint) branches, where a constraint is (cell, tick)
+            or (from_cell, to_cell, tick), or None if the paths are conflict-free
+        """
+        timelines = {agent: [agents[agent][0]] + paths[agent] for agent in agents}
+        horizon = max(len(line) for line in timelines.values())
+
+        def position(agent: int, offset: int) -> Optional[Cell]:
+            line = timelines[agent]
+            if offset < len(line):
+                return line[offset]
+            # Parked on the final cell unless it is a shared dock
+            return None if self.is_shared(line[-1]) else line[-1]
+
+        for offset in range(1, horizon + 1):
+            tick = depart_tick + offset
+            occupants: Dict[Cell, int] = {}
+            arrivals: Dict[Tuple[Cell, Cell], int] = {}
+            for agent in timelines:
+                cell = position(agent, offset)
+                if cell is None:
+                    continue
+                # Head-on swaps are conflicts even through a shared cell
+                previous = position(agent, offset - 1)
+                if previous is not None and previous != cell:
+                    other = arrivals.get((cell, previous))
+                    if other is not None:
+                        return [(other, (cell, previous, tick)), (agent, (previous, cell, tick))]
+                    arrivals[(previous, cell)] = agent
+
+                if self.is_shared(cell):
+                    continue
+                other = occupants.get(cell)
+                if other is not None:
+                    return [(other, (cell, tick)), (agent, (cell, tick))]
+                occupants[cell] = agent
+        return None
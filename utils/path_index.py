@@ -0,0 +1,63 @@
+"""
+Path Index
+Maps grid cells to the robots whose remaining paths cross them.
+"""
+
+from typing import Dict, Iterable, Set, Tuple
+
+
+Cell = Tuple[int, int]
+
+
+class PathIndex:
+    """
+    Index from cell to the robots whose remaining path crosses it.
+
+    Robots report every path they are given and every step they consume, so a
+    layout edit can look up exactly the robots it affects instead of
+    invalidating every path. Visits are counted, so a path that revisits or
+    waits on a cell stays indexed there until its last visit is consumed.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        # cell -> {robot_id: remaining visits}
+        self._cells: Dict[Cell, Dict[int, int]] = {}
+
+    def add_path(self, robot_id: int, path: Iterable[Cell]):
+        """Index every cell of a robot's path."""
+        for cell in path:
+            robots = self._cells.setdefault(cell, {})
+            robots[robot_id] = robots.get(robot_id, 0) + 1
+
+    def remove_path(self, robot_id: int, path: Iterable[Cell]):
+        """Remove every cell of a robot's path from the index."""
+        for cell in path:
+            self.consume(robot_id, cell)
+
+    def consume(self, robot_id: int, cell: Cell):
+        """Remove one visit of a robot to a cell (the robot stepped onto it)."""
+        robots = self._cells.get(cell)
+        if robots is None or robot_id not in robots:
+            return
+        if robots[robot_id] > 1:
+            robots[robot_id] -= 1
+        else:
+            del robots[robot_id]
+            if not robots:
+                del self._cells[cell]
+
+    def robots_at(self, cell: Cell) -> Set[int]:
+        """Get the robots whose remaining path crosses a cell."""
+        return set(self._cells.get(cell, ()))
+
+    def robots_crossing(self, cells: Iterable[Cell]) -> Set[int]:
+        """Get the robots whose remaining path crosses any of the cells."""
+        robots: Set[int] = set()
+        for cell in cells:
+            robots.update(self._cells.get(cell, ()))
+        return robots
+
+    def clear(self):
+        """Drop the whole index."""
+        self._cells.clear()
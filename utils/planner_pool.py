@@ -0,0 +1,216 @@
+"""
+Planner Pool
+Runs path planning on worker threads or processes against frozen grid snapshots,
+so the simulation tick never waits for a search.
+"""
+
+import itertools
+import os
+import pickle
+import tempfile
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from utils.pathfinding import PathFinder
+
+if TYPE_CHECKING:
+    from models.environment import WarehouseGrid
+
+
+_snapshot_ids = itertools.count()
+
+# Worker-side pathfinders, one per thread (and so one per process), for the latest snapshot
+_worker_state = threading.local()
+
+
+def _load(source: Any, loader) -> Any:
+    """Resolve a shipped value: process workers get a file path, thread workers the object itself."""
+    return loader(source) if isinstance(source, str) else source
+
+
+def _load_snapshot(path: str) -> 'WarehouseGrid':
+    """Read a pickled snapshot written by PlannerPool."""
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _write_pickle(path: str, value: Any):
+    """Pickle a value to a file."""
+    with open(path, "wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _plan_on_snapshot(
+    snapshot_id: int,
+    snapshot: Any,
+    congestion_id: int,
+    extra_costs: Any,
+    settings: Dict,
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    occupied_positions: FrozenSet[Tuple[int, int]]
+) -> Optional[List[Tuple[int, int]]]:
+    """
+    Plan one path on a worker.
+
+    PathFinders are not thread-safe (their search arrays are reused between
+    calls), so each worker keeps its own, rebuilt when a newer snapshot arrives.
+    The snapshot and congestion costs are only loaded when their id changes;
+    process workers are sent file paths for them, thread workers the objects.
+    """
+    if getattr(_worker_state, "snapshot_id", None) != snapshot_id:
+        grid = _load(snapshot, _load_snapshot)
+        _worker_state.pathfinder = PathFinder(max(grid.width, grid.height), grid, **settings)
+        _worker_state.snapshot_id = snapshot_id
+        _worker_state.congestion_id = None
+    if _worker_state.congestion_id != congestion_id:
+        _worker_state.pathfinder.set_congestion(None if extra_costs is None else _load(extra_costs, np.load))
+        _worker_state.congestion_id = congestion_id
+    return _worker_state.pathfinder.find_path(start, goal, set(occupied_positions))
+
+
+class PlannerPool:
+    """
+    Planning service backed by a thread or process pool.
+
+    Requests are planned on a frozen snapshot of the warehouse grid taken when
+    they are submitted; a new snapshot is taken only after the layout changes.
+    Thread workers share the snapshot object. Process workers can use every
+    core; the pool writes each snapshot and each congestion update to a temp
+    file once, so requests carry only their endpoints and two file paths.
+    """
+
+    def __init__(self, warehouse_grid: 'WarehouseGrid', workers: Optional[int] = None,
+                 use_processes: bool = False, strategy: str = "astar", weight: float = 1.0):
+        """
+        Initialize the pool.
+
+        Args:
+            warehouse_grid: Live WarehouseGrid to snapshot
+            workers: Number of workers (default: the executor's default)
+            use_processes: Use a process pool instead of a thread pool
+            strategy: PathFinder strategy used by the workers
+            weight: PathFinder heuristic weight used by the workers
+        """
+        self.warehouse_grid = warehouse_grid
+        self.use_processes = use_processes
+        self.workers = workers
+        self._settings = {"strategy": strategy, "weight": weight}
+        if use_processes:
+            self._executor: Executor = ProcessPoolExecutor(max_workers=workers)
+            self._directory: Optional[tempfile.TemporaryDirectory] = tempfile.TemporaryDirectory(prefix="planner-pool-")
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers)
+            self._directory = None
+        self._snapshot_key: Optional[Tuple[int, int]] = None
+        self._snapshot: Optional['WarehouseGrid'] = None
+        self._snapshot_id = -1
+        self._snapshot_source: Any = None
+        self._congestion: Optional[np.ndarray] = None
+        self._congestion_id = 0
+        self._congestion_source: Any = None
+        self._congestion_shipped = True
+        # Shipped files in use: path -> queued requests reading it; superseded files are
+        # deleted once their count drops to zero
+        self._file_users: Dict[str, int] = {}
+        self._current_files: set = set()
+        self._files_lock = threading.Lock()
+
+    def _publish(self, value: Any, name: str, write, previous: Any) -> Any:
+        """Ship a value to the workers: itself for threads, a file written once for processes."""
+        if not self.use_processes:
+            return value
+        path = None
+        if value is not None:
+            path = os.path.join(self._directory.name, name)
+            write(path, value)
+        with self._files_lock:
+            if path is not None:
+                self._current_files.add(path)
+                self._file_users.setdefault(path, 0)
+            if isinstance(previous, str):
+                self._current_files.discard(previous)
+                self._discard_if_unused(previous)
+        return path
+
+    def _discard_if_unused(self, path: str):
+        """Delete a superseded file no queued request still needs (call with _files_lock held)."""
+        if self._file_users.get(path) == 0 and path not in self._current_files:
+            del self._file_users[path]
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _release(self, paths: Tuple[str, ...]):
+        """Done callback: a request no longer needs its files."""
+        with self._files_lock:
+            for path in paths:
+                self._file_users[path] -= 1
+                self._discard_if_unused(path)
+
+    def snapshot(self) -> 'WarehouseGrid':
+        """Get the frozen snapshot of the current layout, taking a new one if it changed."""
+        key = (id(self.warehouse_grid), self.warehouse_grid.version)
+        if key != self._snapshot_key:
+            self._snapshot = self.warehouse_grid.snapshot()
+            self._snapshot_id = next(_snapshot_ids)
+            self._snapshot_key = key
+            self._snapshot_source = self._publish(
+                self._snapshot, f"snapshot-{self._snapshot_id}.pickle", _write_pickle, self._snapshot_source
+            )
+        return self._snapshot
+
+    def set_congestion(self, extra_costs: Optional[np.ndarray]):
+        """
+        Set the congestion costs used by requests submitted from now on.
+
+        Args:
+            extra_costs: Per-cell extra costs (see PathFinder.set_congestion), or None
+        """
+        # Shipped lazily by the next submit, so updates with no requests write nothing
+        self._congestion = extra_costs
+        self._congestion_id += 1
+        self._congestion_shipped = False
+
+    def submit(self, start: Tuple[int, int], goal: Tuple[int, int],
+               occupied_positions: Optional[set] = None) -> Future:
+        """
+        Queue a path request.
+
+        Args:
+            start: Starting position (x, y)
+            goal: Goal position (x, y)
+            occupied_positions: Positions occupied by other robots at submit time
+
+        Returns:
+            Future resolving to the path (as from PathFinder.find_path)
+        """
+        self.snapshot()
+        if not self._congestion_shipped:
+            self._congestion_source = self._publish(
+                self._congestion, f"congestion-{self._congestion_id}.npy", np.save, self._congestion_source
+            )
+            self._congestion_shipped = True
+        paths = tuple(source for source in (self._snapshot_source, self._congestion_source)
+                      if isinstance(source, str))
+        with self._files_lock:
+            for path in paths:
+                self._file_users[path] += 1
+        future = self._executor.submit(
+            _plan_on_snapshot, self._snapshot_id, self._snapshot_source,
+            self._congestion_id, self._congestion_source, self._settings,
+            start, goal, frozenset(occupied_positions or ())
+        )
+        if paths:
+            future.add_done_callback(lambda _: self._release(paths))
+        return future
+
+    def shutdown(self):
+        """Stop the workers, dropping requests that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._directory is not None:
+            self._directory.cleanup()
@@ -0,0 +1,154 @@
+"""
+Reservation Table
+Space-time reservations for cooperative multi-robot path planning.
+"""
+
+from typing import Dict, List, Tuple
+
+
+Cell = Tuple[int, int]
+
+
+class ReservationTable:
+    """
+    Records which robot will occupy each cell at each simulation tick.
+
+    A planned path reserves its start cell at the departure tick, one cell per
+    following tick, and the move into each cell (so two robots cannot swap
+    places head-on). The final cell is then held as a parking spot from the
+    arrival tick onward until the robot plans again or parks elsewhere.
+    Callers can skip parking on shared cells such as stations, where several
+    robots are allowed to dock at once.
+    """
+
+    def __init__(self):
+        """Initialize an empty reservation table."""
+        # (cell, tick) -> agent_id
+        self._slots: Dict[Tuple[Cell, int], int] = {}
+        # (from_cell, to_cell, arrival_tick) -> agent_id
+        self._moves: Dict[Tuple[Cell, Cell, int], int] = {}
+        # cell -> (agent_id, from_tick), held indefinitely
+        self._parked: Dict[Cell, Tuple[int, int]] = {}
+        # Highest tick ever reserved per cell (an upper bound, used by is_free_from)
+        self._last_tick: Dict[Cell, int] = {}
+
+        # Per-agent bookkeeping so an agent's reservations can be released together
+        self._agent_slots: Dict[int, List[Tuple[Cell, int]]] = {}
+        self._agent_moves: Dict[int, List[Tuple[Cell, Cell, int]]] = {}
+        self._agent_parking: Dict[int, Cell] = {}
+
+    def release(self, agent_id: int):
+        """Drop every reservation held by an agent."""
+        for key in self._agent_slots.pop(agent_id, []):
+            if self._slots.get(key) == agent_id:
+                del self._slots[key]
+        for key in self._agent_moves.pop(agent_id, []):
+            if self._moves.get(key) == agent_id:
+                del self._moves[key]
+        cell = self._agent_parking.pop(agent_id, None)
+        if cell is not None and self._parked.get(cell, (None,))[0] == agent_id:
+            del self._parked[cell]
+
+    def park(self, agent_id: int, cell: Cell, from_tick: int):
+        """
+        Hold a cell for an agent from a tick onward, replacing its other reservations.
+
+        Args:
+            agent_id: Robot holding the cell
+            cell: (x, y) position
+            from_tick: First tick the cell is held
+        """
+        self.release(agent_id)
+        self._parked[cell] = (agent_id, from_tick)
+        self._agent_parking[agent_id] = cell
+
+    def reserve_path(self, agent_id: int, start: Cell, path: List[Cell], depart_tick: int,
+                     park: bool = True):
+        """
+        Reserve a path, replacing the agent's other reservations.
+
+        Slots already held by another agent are left untouched, so a
+        best-effort path that conflicts never erases someone else's plan.
+
+        Args:
+            agent_id: Robot following the path
+            start: Cell the robot occupies at depart_tick
+            path: Cells reached at depart_tick + 1, depart_tick + 2, ...
+            depart_tick: Tick at which the robot is still at start
+            park: Hold the final cell after arrival (default: True)
+        """
+        self.release(agent_id)
+        slots = self._agent_slots.setdefault(agent_id, [])
+        moves = self._agent_moves.setdefault(agent_id, [])
+
+        previous = start
+        for offset, cell in enumerate([start] + list(path)):
+            tick = depart_tick + offset
+            if self._slots.setdefault((cell, tick), agent_id) == agent_id:
+                slots.append((cell, tick))
+            if tick > self._last_tick.get(cell, -1):
+                self._last_tick[cell] = tick
+            if offset and cell != previous:
+                if self._moves.setdefault((previous, cell, tick), agent_id) == agent_id:
+                    moves.append((previous, cell, tick))
+            previous = cell
+
+        if park:
+            end = path[-1] if path else start
+            self._parked[end] = (agent_id, depart_tick + len(path))
+            self._agent_parking[agent_id] = end
+
+    def is_reserved(self, cell: Cell, tick: int, agent_id: int) -> bool:
+        """Check if another agent holds a cell at a tick."""
+        holder = self._slots.get((cell, tick))
+        if holder is not None and holder != agent_id:
+            return True
+        parked = self._parked.get(cell)
+        return parked is not None and parked[0] != agent_id and parked[1] <= tick
+
+    def is_swap(self, from_cell: Cell, to_cell: Cell, tick: int, agent_id: int) -> bool:
+        """Check if moving from_cell -> to_cell at a tick would swap places with another agent."""
+        holder = self._moves.get((to_cell, from_cell, tick))
+        return holder is not None and holder != agent_id
+
+    def is_free_from(self, cell: Cell, tick: int, agent_id: int) -> bool:
+        """Check if no other agent needs a cell at this tick or any later one."""
+        parked = self._parked.get(cell)
+        if parked is not None and parked[0] != agent_id:
+            return False
+        for later in range(tick, self._last_tick.get(cell, -1) + 1):
+            holder = self._slots.get((cell, later))
+            if holder is not None and holder != agent_id:
+                return False
+        return True
+
+    def prune(self, before_tick: int):
+        """Forget slot and move reservations for ticks earlier than before_tick."""
+        for agent_id, keys in self._agent_slots.items():
+            kept = []
+            for key in keys:
+                if key[1] < before_tick:
+                    if self._slots.get(key) == agent_id:
+                        del self._slots[key]
+                else:
+                    kept.append(key)
+            self._agent_slots[agent_id] = kept
+        for agent_id, keys in self._agent_moves.items():
+            kept = []
+            for key in keys:
+                if key[2] < before_tick:
+                    if self._moves.get(key) == agent_id:
+                        del self._moves[key]
+                else:
+                    kept.append(key)
+            self._agent_moves[agent_id] = kept
+
+    def clear(self):
+        """Drop all reservations."""
+        self._slots.clear()
+        self._moves.clear()
+        self._parked.clear()
+        self._last_tick.clear()
+        self._agent_slots.clear()
+        self._agent_moves.clear()
+        self._agent_parking.clear()